@@ -1,127 +1,991 @@
+import os
+import sys
+import csv
+import json
 import math
+import heapq
+import argparse
+import functools
+import itertools
+import concurrent.futures
 import sympy as sp
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.integrate import quad
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import IterationResult, make_trace
+from instrumentation import count_evaluations, instrumented, phase
+
+FUNCTION_CACHE_SIZE = 256  # Compiled expressions kept before the least recently used is dropped
+
+class CompiledFunction:
+    """
+    A parsed and lambdified expression, as returned by compile_function.
+    Calling it evaluates the expression; the root finders accept it anywhere
+    an expression string is accepted.
+    """
+    def __init__(self, expression, order, backend, params, sympy_expr, func):
+        self.expression = expression
+        self.order = order
+        self.backend = backend
+        self.params = params
+        self.sympy_expr = sympy_expr
+        self.func = func
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def derivative(self, order=1):
+        """
+        Returns the compiled derivative of this expression (from the cache).
+        """
+        return compile_function(self.expression, self.order + order, self.backend, self.params)
+
+    def with_backend(self, backend):
+        """
+        Returns the same expression compiled for another backend.
+        """
+        return compile_function(self.expression, self.order, backend, self.params)
+
+    def __repr__(self):
+        return f"CompiledFunction({self.expression!r}, order={self.order}, backend={self.backend!r})"
+
+@functools.lru_cache(maxsize=FUNCTION_CACHE_SIZE)
+def _sympify(expression):
+    with phase("parse"):
+        return sp.sympify(expression)
+
+@functools.lru_cache(maxsize=FUNCTION_CACHE_SIZE)
+def _compile_cached(expression, order, backend, params):
+    x = sp.symbols('x')
+    symbols = [x] + [sp.Symbol(name) for name in params]
+    expr = _sympify(expression)
+    with phase("compile"):
+        if order:
+            expr = sp.diff(expr, x, order)
+        return CompiledFunction(expression, order, backend, params, expr, sp.lambdify(symbols, expr, backend))
+
+def compile_function(expression, order=0, backend='math', params=()):
+    """
+    Compiles an expression (or its derivative of the given order) into a callable.
+    Results are kept in a bounded LRU cache keyed on the expression text,
+    derivative order, backend and parameter names, so repeated calls are free.
+    Raises the sympy error if the expression cannot be parsed.
+    """
+    if isinstance(expression, CompiledFunction):
+        return compile_function(expression.expression, expression.order + order, backend, params or expression.params)
+    return _compile_cached(str(expression).strip(), order, backend, tuple(params))
+
+@functools.lru_cache(maxsize=FUNCTION_CACHE_SIZE)
+def _compile_fused_cached(expression, order, backend):
+    x = sp.symbols('x')
+    exprs = [_sympify(expression)]
+    with phase("compile"):
+        for _ in range(order):
+            exprs.append(sp.diff(exprs[-1], x))
+        return sp.lambdify(x, exprs, backend, cse=True)
+
+def compile_fused(expression, order=1, backend='math'):
+    """
+    Compiles f and its first `order` derivatives into one callable that
+    returns [f(x), f'(x), ...]. Common subexpressions are computed once
+    (sympy cse), so f and f' share their intermediate terms.
+    """
+    if isinstance(expression, CompiledFunction):
+        if expression.order:
+            raise ValueError("compile_fused expects the original expression, not a derivative.")
+        expression = expression.expression
+    return _compile_fused_cached(str(expression).strip(), order, backend)
+
+def function_cache_info():
+    """
+    Returns hit/miss statistics of the compiled-expression caches: totals,
+    plus a breakdown for single functions ("functions", compile_function)
+    and fused CSE kernels ("fused", compile_fused).
+    """
+    caches = {"functions": _compile_cached.cache_info(), "fused": _compile_fused_cached.cache_info()}
+    stats = {name: {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+             for name, info in caches.items()}
+    totals = {key: sum(cache[key] for cache in stats.values()) for key in ("hits", "misses", "size", "maxsize")}
+    return {**totals, **stats}
+
+def clear_function_cache():
+    """
+    Drops every compiled expression and resets the cache statistics.
+    """
+    _compile_cached.cache_clear()
+    _compile_fused_cached.cache_clear()
+    _sympify.cache_clear()
+
+def as_function(func, backend='math', params=()):
+    """
+    Accepts an expression string, a CompiledFunction or a plain callable
+    and returns something callable (counting its calls when instrumentation is on).
+    """
+    if isinstance(func, str):
+        func = compile_function(func, backend=backend, params=params)
+    elif isinstance(func, CompiledFunction) and func.backend != backend:
+        func = func.with_backend(backend)
+    return count_evaluations(func)
+
 # Function parsing with sympy
-def parse_function(expression):
+def parse_function(expression, backend='math', params=()):
     """
     Converts a user-input mathematical expression into a callable function.
+    Use backend='numpy' to get a function that works on whole arrays of x.
+    Extra symbol names in params become extra arguments after x.
     """
-    x = sp.symbols('x')
     try:
-        return sp.lambdify(x, sp.sympify(expression), 'math')
+        return compile_function(expression, 0, backend, params)
     except Exception as e:
         print("\nInvalid function format:", e)
         exit()
 
-def derivative(expression):
+def derivative(expression, backend='math', order=1):
     """
     Computes the derivative of the given function as a sympy expression.
     """
-    x = sp.symbols('x')
     try:
-        func_expr = sp.sympify(expression)
-        d_func_expr = sp.diff(func_expr, x)
-        return sp.lambdify(x, d_func_expr, 'math')
+        return compile_function(expression, order, backend)
     except Exception as e:
         print("\nError computing derivative:", e)
         exit()
 
-def bisection_method(func, a, b, epsilon):
+@instrumented
+def bisection_method(func, a, b, epsilon, max_iter=200, trace=None):
     """
     Finds the root of a function using the Bisection Method.
+    Returns an IterationResult; pass trace="print" to see every iteration.
     """
-    if func(a) * func(b) >= 0:
-        print("\nError: Function does not change sign in the interval. Try another interval.")
-        return None
+    func = as_function(func)
+    trace = make_trace(trace)
+    fa, fb = func(a), func(b)
+    evaluations = 2
+    if fa * fb >= 0:
+        return IterationResult(None, 0, evaluations, [], False,
+                               "Function does not change sign in the interval. Try another interval.", trace)
 
+    residuals = []
     iteration = 1
-    while (b - a) / 2 > epsilon:
+    x = a
+    while (b - a) / 2 > epsilon and iteration <= max_iter:
         x = (a + b) / 2
-        print(f"{iteration}-iteration: x = {x:.6f}, f(x) = {func(x):.6f}")
+        fx = func(x)
+        evaluations += 1
+        residuals.append(abs(fx))
+        trace.record(iteration, x, fx)
 
-        if abs(func(x)) < epsilon or (b - a) < epsilon:
-            return x
+        if abs(fx) < epsilon or (b - a) < epsilon:
+            return IterationResult(x, iteration, evaluations, residuals, True, trace=trace)
 
-        if func(x) * func(a) < 0:
+        if fx * fa < 0:
             b = x
         else:
-            a = x
+            a, fa = x, fx
 
         iteration += 1
 
-    return x
+    converged = (b - a) / 2 <= epsilon
+    message = "" if converged else "Bisection method did not converge within max iterations."
+    return IterationResult(x, iteration - 1, evaluations, residuals, converged, message, trace)
+
+@instrumented
+def bisection_method_batch(func, a, b, epsilon, max_iter=200, params=()):
+    """
+    Runs the Bisection Method on many brackets [a, b] at once.
+    func must accept NumPy arrays (see parse_function(..., backend='numpy')).
+    params are per-problem arrays passed to func after x, or a dict of
+    {symbol name: array} when func is an expression string.
+    Converged brackets are frozen while the others keep going.
+    Returns an array of roots, nan where there is no sign change.
+    """
+    if isinstance(params, dict):
+        func = as_function(func, 'numpy', tuple(params))
+        params = tuple(params.values())
+    func = as_function(func, 'numpy')
+    a, b, params, shape = _broadcast_brackets(a, b, params)
+    fa = _evaluate_lanes(func, a, params)
+    fb = _evaluate_lanes(func, b, params)
+    roots, active = _initial_lanes(a, b, fa, fb)
+
+    for _ in range(max_iter):
+        lanes = np.flatnonzero(active)
+        if lanes.size == 0:
+            break
+
+        x = (a[lanes] + b[lanes]) / 2
+        fx = _evaluate_lanes(func, x, [p[lanes] for p in params])
+
+        done = (np.abs(fx) < epsilon) | ((b[lanes] - a[lanes]) / 2 <= 2 * epsilon)
+        roots[lanes[done]] = x[done]
+        active[lanes[done]] = False
+
+        left = fx * fa[lanes] < 0  # Root is in [a, x]
+        b[lanes[left]] = x[left]
+        a[lanes[~left]] = x[~left]
+        fa[lanes[~left]] = fx[~left]
+
+    return roots.reshape(shape)
+
+@instrumented
+def false_position_method_batch(func, a, b, epsilon, max_iter=50, params=()):
+    """
+    Runs the False Position method on many brackets [a, b] at once, with
+    the Illinois modification (the value at an end kept twice in a row is
+    halved), so convex or concave brackets still shrink from both sides.
+    func must accept NumPy arrays (see parse_function(..., backend='numpy')).
+    params are per-problem arrays passed to func after x, or a dict of
+    {symbol name: array} when func is an expression string.
+    A lane stops when |f(x)| < epsilon or the bracket is narrower than
+    2 * epsilon.
+    Returns (roots, converged): roots is nan only where there is no sign
+    change, otherwise the last estimate; converged marks the lanes that met
+    the stopping test within max_iter.
+    """
+    if isinstance(params, dict):
+        func = as_function(func, 'numpy', tuple(params))
+        params = tuple(params.values())
+    func = as_function(func, 'numpy')
+    a, b, params, shape = _broadcast_brackets(a, b, params)
+    fa = _evaluate_lanes(func, a, params)
+    fb = _evaluate_lanes(func, b, params)
+    roots, active = _initial_lanes(a, b, fa, fb)
+    converged = ~np.isnan(roots)  # Exact roots at the bracket ends
+    side = np.zeros(a.shape, dtype=int)  # Which end was replaced last: -1 for b, 1 for a
+
+    for _ in range(max_iter):
+        lanes = np.flatnonzero(active)
+        if lanes.size == 0:
+            break
+
+        x = (a[lanes] * fb[lanes] - b[lanes] * fa[lanes]) / (fb[lanes] - fa[lanes])
+        fx = _evaluate_lanes(func, x, [p[lanes] for p in params])
+        roots[lanes] = x
+
+        left = fx * fa[lanes] < 0  # Root is in [a, x]
+        b[lanes[left]] = x[left]
+        fb[lanes[left]] = fx[left]
+        a[lanes[~left]] = x[~left]
+        fa[lanes[~left]] = fx[~left]
+        fa[lanes[left & (side[lanes] == -1)]] /= 2  # Illinois: a was kept twice in a row
+        fb[lanes[~left & (side[lanes] == 1)]] /= 2  # Illinois: b was kept twice in a row
+        side[lanes] = np.where(left, -1, 1)
 
-def newton_raphson_method(expression, x0, epsilon, max_iter=50):
+        done = (np.abs(fx) < epsilon) | (b[lanes] - a[lanes] <= 2 * epsilon)
+        converged[lanes[done]] = True
+        active[lanes[done]] = False
+
+    return roots.reshape(shape), converged.reshape(shape)
+
+def _broadcast_brackets(a, b, params):
+    """
+    Broadcasts interval ends and parameters to one shape and flattens them.
+    """
+    arrays = np.broadcast_arrays(np.asarray(a, dtype=float), np.asarray(b, dtype=float),
+                                 *[np.asarray(p, dtype=float) for p in params])
+    shape = arrays[0].shape
+    a, b, *params = [arr.ravel().copy() for arr in arrays]
+    return a, b, params, shape
+
+def _evaluate_lanes(func, x, params):
+    """
+    Evaluates func on an array of points, broadcasting constant results.
+    """
+    return np.broadcast_to(np.asarray(func(x, *params), dtype=float), x.shape).copy()
+
+def _initial_lanes(a, b, fa, fb):
+    """
+    Marks brackets that change sign as active and records exact endpoint roots.
+    """
+    roots = np.full(a.shape, np.nan)
+    roots[fb == 0] = b[fb == 0]
+    roots[fa == 0] = a[fa == 0]
+    active = fa * fb < 0
+    return roots, active
+
+@instrumented
+def newton_raphson_method(expression, x0, epsilon, max_iter=50, trace=None):
     """
     Uses Newton-Raphson method to find roots.
+    expression may be a string or a CompiledFunction from parse_function.
+    """
+    return _fused_iteration(expression, x0, epsilon, max_iter, 1, _newton_step, "Newton-Raphson", trace)
+
+@instrumented
+def halley_method(expression, x0, epsilon, max_iter=50, trace=None):
+    """
+    Uses Halley's method (cubic convergence, needs f'') to find roots.
+    """
+    return _fused_iteration(expression, x0, epsilon, max_iter, 2, _halley_step, "Halley", trace)
+
+@instrumented
+def chebyshev_method(expression, x0, epsilon, max_iter=50, trace=None):
+    """
+    Uses Chebyshev's third-order method (needs f'') to find roots.
+    """
+    return _fused_iteration(expression, x0, epsilon, max_iter, 2, _chebyshev_step, "Chebyshev", trace)
+
+def _newton_step(x, f, df):
+    return x - f / df
+
+def _halley_step(x, f, df, d2f):
+    return x - 2 * f * df / (2 * df * df - f * d2f)
+
+def _chebyshev_step(x, f, df, d2f):
+    newton = f / df
+    return x - newton * (1 + f * d2f / (2 * df * df))
+
+def _fused_iteration(expression, x0, epsilon, max_iter, order, step, method_name, trace):
+    """
+    Shared loop of the derivative-based methods. f and its derivatives come
+    from one fused call per point, and no point is evaluated twice.
     """
-    func = parse_function(expression)
-    d_func = derivative(expression)
+    fused = count_evaluations(compile_fused(expression, order))
+    trace = make_trace(trace)
+    values = fused(x0)
+    evaluations = 1
+    residuals = []
 
     iteration = 1
     while iteration <= max_iter:
-        if abs(d_func(x0)) < 1e-10:
-            print("\nError: Derivative is too small. Newton-Raphson method may not converge.")
-            return None
-        
-        x1 = x0 - func(x0) / d_func(x0)
-        print(f"{iteration}-iteration: x = {x1:.6f}, f(x) = {func(x1):.6f}")
+        if abs(values[1]) < 1e-10:
+            return IterationResult(None, iteration - 1, evaluations, residuals, False,
+                                   f"Derivative is too small. {method_name} method may not converge.", trace)
+
+        x1 = step(x0, *values)
+        values = fused(x1)
+        evaluations += 1
+        residuals.append(abs(values[0]))
+        trace.record(iteration, x1, values[0])
 
         if abs(x1 - x0) < epsilon:
-            return x1
+            return IterationResult(x1, iteration, evaluations, residuals, True, trace=trace)
 
         x0 = x1
         iteration += 1
 
-    print("\nWarning: Newton-Raphson method did not converge within max iterations.")
-    return None
+    return IterationResult(None, max_iter, evaluations, residuals, False,
+                           f"{method_name} method did not converge within max iterations.", trace)
 
-def false_position_method(func, a, b, epsilon, max_iter=50):
+@instrumented
+def false_position_method(func, a, b, epsilon, max_iter=50, trace=None):
     """
     Uses the False Position (Regula Falsi) method to find roots.
+    Returns an IterationResult; pass trace="print" to see every iteration.
     """
-    if func(a) * func(b) >= 0:
-        print("\nError: Function does not change sign in the interval. Try another interval.")
-        return None
+    func = as_function(func)
+    trace = make_trace(trace)
+    fa, fb = func(a), func(b)
+    evaluations = 2
+    if fa * fb >= 0:
+        return IterationResult(None, 0, evaluations, [], False,
+                               "Function does not change sign in the interval. Try another interval.", trace)
 
+    residuals = []
     iteration = 1
     while iteration <= max_iter:
-        x = (a * func(b) - b * func(a)) / (func(b) - func(a))  # False Position formula
-        print(f"{iteration}-iteration: x = {x:.6f}, f(x) = {func(x):.6f}")
+        x = (a * fb - b * fa) / (fb - fa)  # False Position formula
+        fx = func(x)
+        evaluations += 1
+        residuals.append(abs(fx))
+        trace.record(iteration, x, fx)
 
-        if abs(func(x)) < epsilon:
-            return x
+        if abs(fx) < epsilon:
+            return IterationResult(x, iteration, evaluations, residuals, True, trace=trace)
 
-        if func(x) * func(a) < 0:
-            b = x
+        if fx * fa < 0:
+            b, fb = x, fx
+        else:
+            a, fa = x, fx
+
+        iteration += 1
+
+    return IterationResult(None, max_iter, evaluations, residuals, False,
+                           "False Position method did not converge within max iterations.", trace)
+
+@instrumented
+def brent_method(func, a, b, epsilon, max_iter=None, trace=None):
+    """
+    Uses Brent's method: inverse quadratic interpolation and secant steps,
+    falling back to bisection whenever they would not shrink the bracket
+    fast enough. Endpoint values are cached, so every iteration costs exactly
+    one function evaluation. Stops when the bracket is below epsilon.
+    If two steps in a row fail to halve the bracket (multiple roots),
+    a bisection step is forced, so the bracket halves at least every third
+    step: at worst about three times the evaluations of bisection, which is
+    what the default max_iter, 3 * log2(|b - a| / epsilon) + 6, allows for.
+    """
+    if max_iter is None:
+        max_iter = _safeguarded_budget(a, b, epsilon)
+    func = as_function(func)
+    trace = make_trace(trace)
+    fa, fb = func(a), func(b)
+    evaluations = 2
+    if fa * fb > 0:
+        return IterationResult(None, 0, evaluations, [], False,
+                               "Function does not change sign in the interval. Try another interval.", trace)
+    if fa == 0:
+        return IterationResult(a, 0, evaluations, [0.0], True, trace=trace)
+
+    c, fc = b, fb
+    d = e = b - a
+    width = abs(b - a)
+    slow_steps = 0
+    residuals = []
+
+    iteration = 1
+    while iteration <= max_iter:
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa  # Keep the root between b and c
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b  # b is always the best estimate so far
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2 * np.finfo(float).eps * abs(b) + 0.5 * epsilon
+        xm = 0.5 * (c - b)
+        if abs(xm) <= tol or fb == 0:
+            return IterationResult(b, iteration - 1, evaluations, residuals, True, trace=trace)
+
+        slow_steps = slow_steps + 1 if abs(c - b) > 0.5 * width else 0
+        if slow_steps == 0:
+            width = abs(c - b)
+
+        if slow_steps >= 2:
+            d = e = xm  # Forced bisection step
+            slow_steps = 0
+            width = abs(c - b)
+        elif abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:  # Secant step
+                p = 2 * xm * s
+                q = 1 - s
+            else:  # Inverse quadratic interpolation
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * xm * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * xm * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q  # Interpolation accepted
+            else:
+                d = e = xm  # Bisection step
         else:
-            a = x
+            d = e = xm
 
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, xm)
+        fb = func(b)
+        evaluations += 1
+        residuals.append(abs(fb))
+        trace.record(iteration, b, fb)
         iteration += 1
 
-    print("\nWarning: False Position method did not converge within max iterations.")
-    return None
+    return IterationResult(b, max_iter, evaluations, residuals, False,
+                           "Brent's method did not converge within max iterations.", trace)
 
-def fixed_point_iteration_method(func, g_func, x0, epsilon, max_iter=50):
+def _safeguarded_budget(a, b, epsilon):
+    """
+    Iteration budget of a bracketing method that halves the bracket at
+    least every third step: 3 * log2(|b - a| / epsilon) + 6.
+    """
+    return 3 * math.ceil(math.log2(max(abs(b - a) / epsilon, 1.0))) + 6
+
+@instrumented
+def illinois_method(func, a, b, epsilon, max_iter=None, variant="illinois", trace=None):
+    """
+    Uses modified regula falsi. When the same endpoint is kept twice in a row
+    its function value is scaled down (by 1/2 for variant="illinois", by the
+    Anderson-Bjorck factor for variant="anderson-bjorck"), so the stale
+    endpoint moves and convergence is superlinear even on convex functions.
+    Stops like brent_method, when the bracket is below epsilon (plus a few
+    ulps of x) or f(x) is exactly zero, so both give the same accuracy; and
+    like brent_method, a bisection step is forced when two steps in a row
+    fail to halve the bracket (multiple roots), with the same default max_iter.
+    """
+    if variant not in ("illinois", "anderson-bjorck"):
+        raise ValueError(f"Unknown regula falsi variant: {variant!r}")
+    if max_iter is None:
+        max_iter = _safeguarded_budget(a, b, epsilon)
+    func = as_function(func)
+    trace = make_trace(trace)
+    fa, fb = func(a), func(b)
+    evaluations = 2
+    if fa * fb > 0:
+        return IterationResult(None, 0, evaluations, [], False,
+                               "Function does not change sign in the interval. Try another interval.", trace)
+    if fa == 0 or fb == 0:
+        return IterationResult(a if fa == 0 else b, 0, evaluations, [0.0], True, trace=trace)
+
+    residuals = []
+    width = abs(b - a)
+    slow_steps = 0
+    iteration = 1
+    while iteration <= max_iter:
+        bisect = slow_steps >= 2
+        x = 0.5 * (a + b) if bisect else (a * fb - b * fa) / (fb - fa)
+        fx = func(x)
+        evaluations += 1
+        residuals.append(abs(fx))
+        trace.record(iteration, x, fx)
+
+        if fx * fb < 0:
+            a, fa = b, fb  # Sign change between b and x, the old b becomes the other end
+        elif bisect:
+            pass
+        elif variant == "illinois":
+            fa *= 0.5
+        else:
+            m = 1 - fx / fb
+            fa *= m if m > 0 else 0.5
+        b, fb = x, fx
+
+        tol = 2 * np.finfo(float).eps * abs(x) + 0.5 * epsilon
+        if fx == 0 or abs(b - a) <= 2 * tol:
+            return IterationResult(x, iteration, evaluations, residuals, True, trace=trace)
+        slow_steps = 0 if bisect or abs(b - a) <= 0.5 * width else slow_steps + 1
+        if slow_steps == 0:
+            width = abs(b - a)
+
+        iteration += 1
+
+    return IterationResult(None, max_iter, evaluations, residuals, False,
+                           "Modified regula falsi did not converge within max iterations.", trace)
+
+def bracketing_method(func, a, b, epsilon, method="brent", max_iter=None, trace=None):
+    """
+    Runs one of the bracketing solvers by name: "brent", "illinois",
+    "anderson-bjorck", "bisection" or "false-position". Without max_iter
+    each solver uses its own default.
+    """
+    options = {} if max_iter is None else {"max_iter": max_iter}
+    if method == "brent":
+        return brent_method(func, a, b, epsilon, trace=trace, **options)
+    if method in ("illinois", "anderson-bjorck"):
+        return illinois_method(func, a, b, epsilon, variant=method, trace=trace, **options)
+    if method == "bisection":
+        return bisection_method(func, a, b, epsilon, trace=trace, **options)
+    if method == "false-position":
+        return false_position_method(func, a, b, epsilon, trace=trace, **options)
+    raise ValueError(f"Unknown bracketing method: {method!r}")
+
+@instrumented
+def find_all_roots(expression, lo, hi, epsilon=1e-10, samples=256, max_depth=10, workers=None):
+    """
+    Finds every root of expression in [lo, hi].
+    The function is sampled on a vectorized grid that is refined where |f|
+    dips towards zero or the slope changes sign (roots that touch or come in
+    close pairs), then every sign change is refined concurrently: all at once
+    with bisection_method_batch, or with Brent's method in a process pool of
+    `workers` processes for expensive expressions (workers needs an
+    expression string or a CompiledFunction, which is recompiled in each
+    process; plain callables cannot be sent to other processes).
+    A pole also changes sign, so a refined point is kept only if |f| there
+    is below half of |f| at its bracket ends (it grows towards a pole).
+    Returns a sorted array of roots.
+    """
+    if workers and not isinstance(expression, (str, CompiledFunction)):
+        raise TypeError("find_all_roots with workers needs an expression string or a CompiledFunction.")
+    func = as_function(expression, 'numpy')
+    x = np.linspace(lo, hi, samples)
+    with np.errstate(all="ignore"):  # Samples on a pole are inf/nan and never bracket a root
+        y = _evaluate_lanes(func, x, [])
+
+    for _ in range(max_depth):
+        suspicious = _suspicious_intervals(y)
+        if not suspicious.any():
+            break
+        midpoints = (x[:-1][suspicious] + x[1:][suspicious]) / 2
+        x = np.concatenate([x, midpoints])
+        with np.errstate(all="ignore"):
+            y = np.concatenate([y, _evaluate_lanes(func, midpoints, [])])
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+
+    exact = x[y == 0]
+    signed = np.flatnonzero(np.isfinite(y) & (y != 0))  # Sign changes are looked for across exact zeros
+    changes = np.flatnonzero(y[signed[:-1]] * y[signed[1:]] < 0)
+    a, b = x[signed[changes]], x[signed[changes + 1]]
+
+    if workers and len(a) > 0:
+        compiled = compile_function(expression)
+        task = (compiled.expression, compiled.order, compiled.params)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(a) // (4 * workers))
+            refined = np.array(list(pool.map(_refine_bracket, itertools.repeat(task), a, b,
+                                             itertools.repeat(epsilon), chunksize=chunksize)), dtype=float)
+    else:
+        with np.errstate(all="ignore"):  # A bracket around a pole may hit it exactly
+            refined = bisection_method_batch(func, a, b, epsilon)
+
+    ends = np.maximum(np.abs(y[signed[changes]]), np.abs(y[signed[changes + 1]]))
+    with np.errstate(all="ignore"):
+        residual = np.abs(_evaluate_lanes(func, refined, []))
+    refined = refined[np.isfinite(refined) & (residual < 0.5 * ends)]  # Poles and jumps are not roots
+    roots = np.sort(np.concatenate([exact, refined]))
+    if len(roots) > 1:
+        roots = roots[np.concatenate([[True], np.diff(roots) > epsilon])]  # Roots on grid points are found twice
+    return roots
+
+def _suspicious_intervals(y):
+    """
+    Flags grid intervals without a sign change that may still hide roots:
+    next to a local extremum of f that is small compared to the local
+    variation of f, so a pair of roots could sit between two samples, and
+    next to a sample that hit a root exactly, which hides the sign of f
+    around it.
+    """
+    flagged = np.zeros(len(y) - 1, dtype=bool)
+    if len(y) < 3:
+        return flagged
+    dy = np.diff(y)
+    extremum = np.sign(dy[:-1]) != np.sign(dy[1:])
+    small = np.abs(y[1:-1]) <= np.maximum(np.abs(dy[:-1]), np.abs(dy[1:]))
+    same_sign = (y[:-2] * y[1:-1] > 0) & (y[1:-1] * y[2:] > 0)
+    candidate = extremum & small & same_sign & np.isfinite(y[1:-1])
+    flagged[:-1] |= candidate  # Interval to the left of the extremum
+    flagged[1:] |= candidate   # Interval to the right of the extremum
+    zero = y == 0
+    flagged |= zero[:-1] | zero[1:]  # A second root may sit right next to an exact one
+    return flagged
+
+def _refine_bracket(task, a, b, epsilon):
+    """
+    Process-pool worker: recompiles (expression, order, params) and refines
+    one bracket with Brent's method.
+    """
+    expression, order, params = task
+    result = brent_method(compile_function(expression, order, params=params), a, b, epsilon)
+    return result.root if result.converged else np.nan
+
+@instrumented
+def fixed_point_iteration_method(func, g_func, x0, epsilon, max_iter=50, acceleration=None, depth=5, trace=None):
     """
     Uses Fixed-Point Iteration method to find roots.
+    acceleration: None (plain x = g(x)), "aitken" (Aitken delta-squared
+    extrapolation of the iterates), "steffensen" (restart from the Aitken
+    value, quadratic convergence) or "anderson" (Anderson mixing over the
+    last `depth` residuals). x0 may be a NumPy vector when g_func maps
+    vectors to vectors; Aitken and Steffensen are scalar-only.
+    func is only evaluated for the trace (it may be None); the residual
+    history holds the step sizes |x1 - x0| (max-norm for vectors).
     """
+    if acceleration not in (None, "aitken", "steffensen", "anderson"):
+        raise ValueError(f"Unknown acceleration: {acceleration!r}")
+    vector = np.ndim(x0) > 0
+    if vector and acceleration in ("aitken", "steffensen"):
+        raise ValueError("Aitken and Steffensen acceleration are scalar; use acceleration='anderson' for vectors.")
+    if vector:
+        x0 = np.array(x0, dtype=float)
+
+    func = as_function(func) if func is not None else None
+    g_func = as_function(g_func)
+    trace = make_trace(trace)
+    step = _fixed_point_step(g_func, acceleration, depth)
+    evaluations = 0
+    residuals = []
+
     iteration = 1
     while iteration <= max_iter:
-        x1 = g_func(x0)
-        print(f"{iteration}-iteration: x = {x1:.6f}, f(x) = {func(x1):.6f}")
+        x1, used = step(x0)
+        evaluations += used
+        change = float(np.max(np.abs(x1 - x0)))
+        residuals.append(change)
+        if trace.enabled:
+            trace.record(iteration, x1, func(x1) if func is not None and not vector else change)
 
-        if abs(x1 - x0) < epsilon:
-            return x1
+        if change < epsilon:
+            return IterationResult(x1, iteration, evaluations, residuals, True, trace=trace)
 
         x0 = x1
         iteration += 1
 
-    print("\nWarning: Fixed-Point Iteration method did not converge within max iterations.")
-    return None
+    return IterationResult(None, max_iter, evaluations, residuals, False,
+                           "Fixed-Point Iteration method did not converge within max iterations.", trace)
+
+def _fixed_point_step(g_func, acceleration, depth):
+    """
+    Returns step(x) -> (next x, number of g evaluations) for the chosen acceleration.
+    """
+    if acceleration is None:
+        return lambda x: (g_func(x), 1)
+
+    if acceleration == "steffensen":
+        def steffensen_step(x):
+            x1 = g_func(x)
+            x2 = g_func(x1)
+            denominator = x2 - 2 * x1 + x
+            if denominator == 0:
+                return x2, 2
+            return x - (x1 - x) ** 2 / denominator, 2
+        return steffensen_step
+
+    if acceleration == "aitken":
+        picard = []  # Plain iterates; the returned x is their Aitken extrapolation
+
+        def aitken_step(x):
+            if not picard:
+                picard.append(x)
+            picard.append(g_func(picard[-1]))
+            del picard[:-3]
+            if len(picard) < 3:
+                return picard[-1], 1
+            p0, p1, p2 = picard
+            denominator = p2 - 2 * p1 + p0
+            if denominator == 0:
+                return p2, 1
+            return p0 - (p1 - p0) ** 2 / denominator, 1
+        return aitken_step
+
+    residual_history = []  # Anderson mixing: f = g(x) - x and g(x) of the last depth + 1 iterates
+    g_history = []
+
+    def anderson_step(x):
+        gx = np.atleast_1d(np.asarray(g_func(x), dtype=float))
+        residual_history.append(gx - np.atleast_1d(x))
+        g_history.append(gx)
+        del residual_history[:-(depth + 1)]
+        del g_history[:-(depth + 1)]
+        if len(residual_history) == 1:
+            x_next = gx
+        else:
+            delta_f = np.diff(np.array(residual_history), axis=0).T
+            delta_g = np.diff(np.array(g_history), axis=0).T
+            gamma = np.linalg.lstsq(delta_f, residual_history[-1], rcond=None)[0]
+            x_next = gx - delta_g @ gamma
+        return (x_next if np.ndim(x) else float(x_next[0])), 1
+    return anderson_step
+
+# Gauss-Kronrod 7/15 nodes on [-1, 1] (non-negative half) and weights
+KRONROD_NODES = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                          0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                          0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                          0.207784955007898467600689403773245, 0.000000000000000000000000000000000])
+KRONROD_WEIGHTS = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                            0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                            0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                            0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+GAUSS_WEIGHTS = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                          0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+
+# All 15 nodes in order, and the full Kronrod / Gauss weight vectors over them
+_GK_NODES = np.concatenate([-KRONROD_NODES[:-1], KRONROD_NODES[::-1]])
+_GK_KRONROD = np.concatenate([KRONROD_WEIGHTS[:-1], KRONROD_WEIGHTS[::-1]])
+_GK_GAUSS = np.zeros(15)
+_GK_GAUSS[[1, 3, 5, 7, 9, 11, 13]] = np.concatenate([GAUSS_WEIGHTS[:-1], GAUSS_WEIGHTS[::-1]])
+
+class IntegralResult:
+    """
+    Outcome of gauss_kronrod_integral: the value, its error estimate, the
+    number of integrand evaluations (points), vectorized calls of the
+    integrand and subintervals used.
+    """
+    def __init__(self, value, error, evaluations, calls, intervals, converged, message=""):
+        self.value = value
+        self.error = error
+        self.evaluations = evaluations
+        self.calls = calls
+        self.intervals = intervals
+        self.converged = converged
+        self.message = message
+
+    def __repr__(self):
+        return (f"IntegralResult(value={self.value!r}, error={self.error:.3g}, "
+                f"evaluations={self.evaluations}, calls={self.calls}, intervals={self.intervals}, converged={self.converged})")
+
+@instrumented
+def gauss_kronrod_integral(func, a, b, tolerance=1e-10, rel_tolerance=1e-10, max_intervals=2000, batch=16):
+    """
+    Computes the definite integral of func over [a, b] with adaptive
+    Gauss-Kronrod (G7/K15) quadrature.
+    func must accept NumPy arrays: whole panels of 15 nodes are evaluated in
+    one call. The subintervals with the largest error estimate |K15 - G7|
+    are kept in a priority queue; each step bisects the worst ones (at most
+    `batch`, and only as many as needed to cover the excess error) until the
+    total error is below max(tolerance, rel_tolerance * |value|).
+    """
+    func = as_function(func, 'numpy')
+    values, errors = _gauss_kronrod_panels(func, np.array([a], dtype=float), np.array([b], dtype=float))
+    heap = [(-errors[0], a, b, values[0])]
+    total_value, total_error = values[0], errors[0]
+    evaluations, calls = 15, 1
+
+    while total_error > max(tolerance, rel_tolerance * abs(total_value)) and len(heap) < max_intervals:
+        excess = total_error - max(tolerance, rel_tolerance * abs(total_value))
+        worst = [heapq.heappop(heap)]
+        while heap and len(worst) < batch and -sum(item[0] for item in worst) < excess:
+            worst.append(heapq.heappop(heap))  # Split just enough panels to possibly meet the tolerance
+        lefts = np.array([item[1] for item in worst])
+        rights = np.array([item[2] for item in worst])
+        mids = (lefts + rights) / 2
+        values, errors = _gauss_kronrod_panels(func, np.concatenate([lefts, mids]), np.concatenate([mids, rights]))
+        evaluations += 15 * len(values)
+        calls += 1
+
+        for item in worst:
+            total_value -= item[3]
+            total_error += item[0]  # item[0] is -error
+        total_value += values.sum()
+        total_error += errors.sum()
+        starts = np.concatenate([lefts, mids])
+        ends = np.concatenate([mids, rights])
+        for start, end, value, error in zip(starts, ends, values, errors):
+            heapq.heappush(heap, (-error, start, end, value))
+
+    # Re-add from the panels to avoid rounding drift in the running sums
+    total_value = math.fsum(item[3] for item in heap)
+    total_error = math.fsum(-item[0] for item in heap)
+    converged = total_error <= max(tolerance, rel_tolerance * abs(total_value))
+    message = "" if converged else "Maximum number of subintervals reached before the tolerance was met."
+    return IntegralResult(total_value, total_error, evaluations, calls, len(heap), converged, message)
+
+def _gauss_kronrod_panels(func, starts, ends):
+    """
+    Evaluates the K15 and G7 rules on many panels with one vectorized call.
+    Returns the K15 values and error estimates: |K15 - G7| rescaled as in
+    QUADPACK's qk15, which is far less pessimistic for smooth integrands.
+    """
+    centers = (starts + ends) / 2
+    half_widths = (ends - starts) / 2
+    x = centers[:, None] + half_widths[:, None] * _GK_NODES
+    y = _evaluate_lanes(func, x.ravel(), []).reshape(x.shape)
+    kronrod = y @ _GK_KRONROD
+    gauss = y @ _GK_GAUSS
+    spread = np.abs(y - (kronrod / 2)[:, None]) @ _GK_KRONROD
+    size = np.abs(y) @ _GK_KRONROD
+
+    scale = np.abs(half_widths)
+    error = np.abs(kronrod - gauss) * scale
+    spread *= scale
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scaled = spread * np.minimum(1, (200 * error / spread) ** 1.5)
+    error = np.where((spread != 0) & (error != 0), scaled, error)
+    error = np.maximum(error, 50 * np.finfo(float).eps * size * scale)
+    return kronrod * half_widths, error
+
+BATCH_FIELDS = ["row", "id", "expression", "method", "root", "converged", "iterations", "evaluations", "error"]
+
+def run_batch(input_path, output_path, workers=None, chunksize=64):
+    """
+    Solves every root-finding problem of a CSV or JSONL file without prompts.
+    Each row has: expression, method (bisection, false-position, brent,
+    illinois, anderson-bjorck, newton, halley, chebyshev, fixed-point),
+    a and b or x0, optional epsilon (default 1e-6), g for fixed-point and id.
+    Rows are grouped by expression so each worker compiles it once, chunks
+    are spread over a process pool (workers=1 runs in this process), and
+    results are written to output_path (.csv or .jsonl) as they complete.
+    A failing row is reported in the error column and does not stop the job.
+    Returns (number solved, number failed).
+    """
+    groups = {}
+    for row in _read_problems(input_path):
+        groups.setdefault(row.get("expression", ""), []).append(row)
+    chunks = [(expression, rows[i:i + chunksize])
+              for expression, rows in groups.items() for i in range(0, len(rows), chunksize)]
+
+    solved = failed = 0
+    with _BatchWriter(output_path) as writer:
+        if workers == 1:
+            completed = (_solve_chunk(expression, rows) for expression, rows in chunks)
+            for results in completed:
+                solved, failed = writer.write(results, solved, failed)
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_solve_chunk, expression, rows) for expression, rows in chunks]
+                for future in concurrent.futures.as_completed(futures):
+                    solved, failed = writer.write(future.result(), solved, failed)
+    return solved, failed
+
+def _read_problems(path):
+    """
+    Yields the problems of a CSV or JSONL file as dicts, numbering the rows.
+    """
+    with open(path, newline="") as file:
+        if path.endswith(".jsonl"):
+            rows = (json.loads(line) for line in file if line.strip())
+        else:
+            rows = csv.DictReader(file)
+        for number, row in enumerate(rows, start=1):
+            row = {key: value for key, value in row.items() if value not in ("", None)}
+            row["row"] = number
+            yield row
+
+class _BatchWriter:
+    """
+    Streams batch results to a CSV or JSONL file, flushing after every chunk.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        self.file = open(self.path, "w", newline="")
+        if not self.path.endswith(".jsonl"):
+            self.csv = csv.DictWriter(self.file, fieldnames=BATCH_FIELDS)
+            self.csv.writeheader()
+        return self
+
+    def write(self, results, solved, failed):
+        for result in results:
+            if self.path.endswith(".jsonl"):
+                self.file.write(json.dumps(result) + "\n")
+            else:
+                self.csv.writerow(result)
+            if result["error"] is None and result["converged"]:
+                solved += 1
+            else:
+                failed += 1
+        self.file.flush()
+        return solved, failed
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+def _solve_chunk(expression, rows):
+    """
+    Process-pool worker: compiles the expression once and solves each row,
+    catching errors per row.
+    """
+    try:
+        func = compile_function(expression)
+        compile_error = None
+    except Exception as e:
+        func, compile_error = None, f"Invalid function format: {e}"
+
+    results = []
+    for row in rows:
+        result = {"row": row["row"], "id": row.get("id"), "expression": expression, "method": row.get("method"),
+                  "root": None, "converged": False, "iterations": None, "evaluations": None, "error": compile_error}
+        if func is not None:
+            try:
+                solution = _solve_problem(func, row)
+                result.update(root=solution.root, converged=solution.converged, iterations=solution.iterations,
+                              evaluations=solution.evaluations, error=solution.message or None)
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+        results.append(result)
+    return results
+
+def _solve_problem(func, row):
+    """
+    Runs the method named in a batch row.
+    """
+    method = str(row.get("method", "brent")).strip().lower()
+    epsilon = float(row.get("epsilon", 1e-6))
+    if method in ("bisection", "false-position", "brent", "illinois", "anderson-bjorck"):
+        return bracketing_method(func, float(row["a"]), float(row["b"]), epsilon, method)
+    if method in ("newton", "newton-raphson"):
+        return newton_raphson_method(func, float(row["x0"]), epsilon)
+    if method == "halley":
+        return halley_method(func, float(row["x0"]), epsilon)
+    if method == "chebyshev":
+        return chebyshev_method(func, float(row["x0"]), epsilon)
+    if method in ("fixed-point", "fixed-point-iteration"):
+        return fixed_point_iteration_method(func, row["g"], float(row["x0"]), epsilon,
+                                            acceleration=row.get("acceleration"))
+    raise ValueError(f"Unknown method: {method!r}")
 
 def main():
     """
@@ -143,47 +1007,92 @@ def main():
         print("2 - Newton-Raphson Method (Requires Initial Guess x0)")
         print("3 - False Position Method (Requires Interval [a, b])")
         print("4 - Fixed-Point Iteration Method (Requires Initial Guess x0 & g(x))")
-        method_choice = input("Enter method choice (1, 2, 3, or 4): ").strip()
+        print("5 - Halley's Method (Requires Initial Guess x0)")
+        print("6 - Brent's Method (Requires Interval [a, b])")
+        print("7 - Illinois Method (Requires Interval [a, b])")
+        print("8 - All Roots in an Interval (Requires Interval [a, b])")
+        method_choice = input("Enter method choice (1-8): ").strip()
 
         epsilon = float(input("Enter precision (epsilon): "))
 
-        if method_choice in ["1", "3"]:  # Bisection or False Position
+        if method_choice == "8":
+            a = float(input("Enter interval start (a): "))
+            b = float(input("Enter interval end (b): "))
+            roots = find_all_roots(parse_function(expression), a, b, epsilon)
+            print(f"\nFound {len(roots)} root(s) in [{a}, {b}]:")
+            for root in roots:
+                print(f" x = {root:.6f}")
+            print("\n# Operation Completed Successfully!")
+            return
+
+        if method_choice in ["1", "3", "6", "7"]:  # Bracketing methods
             a = float(input("Enter interval start (a): "))
             b = float(input("Enter interval end (b): "))
             func = parse_function(expression)
 
             if method_choice == "1":
                 print("\nBisection Method:")
-                root = bisection_method(func, a, b, epsilon)
+                result = bisection_method(func, a, b, epsilon, trace="print")
                 method_name = "Bisection"
 
+            elif method_choice == "6":
+                print("\nBrent's Method:")
+                result = brent_method(func, a, b, epsilon, trace="print")
+                method_name = "Brent's"
+
+            elif method_choice == "7":
+                print("\nIllinois Method:")
+                result = illinois_method(func, a, b, epsilon, trace="print")
+                method_name = "Illinois"
+
             else:  # method_choice == "3"
                 print("\nFalse Position Method:")
-                root = false_position_method(func, a, b, epsilon)
+                result = false_position_method(func, a, b, epsilon, trace="print")
                 method_name = "False Position"
 
-        elif method_choice in ["2", "4"]:  # Newton-Raphson or Fixed-Point Iteration
+        elif method_choice in ["2", "4", "5"]:  # Newton-Raphson, Fixed-Point Iteration or Halley
             x0 = float(input("Enter initial guess x0: "))
             func = parse_function(expression)
 
             if method_choice == "2":
                 print("\nNewton-Raphson Method:")
-                root = newton_raphson_method(expression, x0, epsilon)
+                result = newton_raphson_method(func, x0, epsilon, trace="print")
                 method_name = "Newton-Raphson"
 
+            elif method_choice == "5":
+                print("\nHalley's Method:")
+                result = halley_method(func, x0, epsilon, trace="print")
+                method_name = "Halley's"
+
             else:  # method_choice == "4"
                 g_expression = input("Enter g(x) for Fixed-Point Iteration (e.g., 'sqrt(2 + x)'): ").strip()
                 g_func = parse_function(g_expression)
+                acceleration = input("Acceleration (none, aitken, steffensen, anderson) [none]: ").strip().lower()
+                acceleration = None if acceleration in ("", "none") else acceleration
                 print("\nFixed-Point Iteration Method:")
-                root = fixed_point_iteration_method(func, g_func, x0, epsilon)
+                result = fixed_point_iteration_method(func, g_func, x0, epsilon, acceleration=acceleration, trace="print")
                 method_name = "Fixed-Point Iteration"
 
         else:
             print("\nInvalid method choice. Exiting.")
             return
 
-        if root is not None:
-            print(f" Root found at x = {root:.6f} using {method_name} Method.")
+        if result.converged:
+            print(f" Root found at x = {result.root:.6f} using {method_name} Method "
+                  f"({result.evaluations} function evaluations).")
+        else:
+            print(f"\n{result.message}")
+
+    elif choice == "2":
+        a = float(input("Enter lower limit (a): "))
+        b = float(input("Enter upper limit (b): "))
+        tolerance = float(input("Enter tolerance (e.g., 1e-10): "))
+        result = gauss_kronrod_integral(parse_function(expression, 'numpy'), a, b, tolerance, tolerance)
+        if not result.converged:
+            print(f"\nWarning: {result.message}")
+        print(f"\nIntegral of {expression} from {a} to {b} = {result.value:.10f}")
+        print(f" Error estimate: {result.error:.3e} ({result.evaluations} evaluations in {result.calls} "
+              f"vectorized calls, {result.intervals} subintervals)")
 
     else:
         print("\nInvalid choice. Exiting.")
@@ -191,4 +1100,14 @@ def main():
     print("\n# Operation Completed Successfully!")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Solve root-finding problems from a CSV/JSONL file.")
+        parser.add_argument("input", help="CSV or JSONL file with one problem per row")
+        parser.add_argument("output", help="CSV or JSONL file for the results")
+        parser.add_argument("--workers", type=int, default=None, help="worker processes (1 = no pool)")
+        parser.add_argument("--chunksize", type=int, default=64, help="rows per task")
+        args = parser.parse_args()
+        solved, failed = run_batch(args.input, args.output, args.workers, args.chunksize)
+        print(f"Solved {solved} problem(s), {failed} failed or did not converge.")
+    else:
+        main()
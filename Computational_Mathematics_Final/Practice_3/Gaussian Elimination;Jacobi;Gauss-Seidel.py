@@ -1,56 +1,379 @@
-def gaussian_elimination(A, B): # Вход матрица и вектор
-    n = len(A) #  Возвращает количество row в матрице A
+import os
+import sys
+import time
+import hashlib
+import shlex
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
 
-    for i in range(n):
-        A[i] = [float(a) for a in A[i]]
-        B[i] = float(B[i]) # Преобразует все элементы в floats
+try:
+    import scipy.sparse as sparse
+    import scipy.sparse.linalg as sparse_linalg
+except ImportError: # scipy нужен только для разреженных матриц
+    sparse = sparse_linalg = None
 
-    for i in range(n):
-        max_row = i
-        for k in range(i + 1, n):
-            if abs(A[k][i]) > abs(A[max_row][i]):
-                max_row = k
-        A[i], A[max_row] = A[max_row], A[i]
-        B[i], B[max_row] = B[max_row], B[i] # Перестановка row
-
-        for j in range(i + 1, n):
-            factor = A[j][i] / A[i][i]
-            for k in range(i, n):
-                A[j][k] -= factor * A[i][k]
-            B[j] -= factor * B[i] # Forward elimination для приведения A к U
-
-    x = [0] * n
-    for i in range(n - 1, -1, -1):
-        x[i] = B[i]
-        for j in range(i + 1, n):
-            x[i] -= A[i][j] * x[j]
-        x[i] /= A[i][i] # Обратная подстановка
-
-    return x # Возвращает решение
-
-def jacobi_method(A, B, iterations=25, tolerance=1e-10):
-    n = len(A)
-    x = [0] * n # Создаем массив нулей длины n
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError: # threadpoolctl только ограничивает BLAS в процессах parallel_jacobi_method
+    threadpool_limits = None
 
-    for iteration in range(iterations):
-        x_new = [0] * n
-        for i in range(n):
-            s = sum(A[i][j] * x[j] for j in range(n) if j != i)
-            x_new[i] = (B[i] - s) / A[i][i] # Сумма всех элементов, кроме диагонали A[i][i]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import IterationResult, PrintTrace, make_trace
+from instrumentation import instrumented, phase
+from loaders import load_system
 
-        print(f"Iteration {iteration+1}: x = {x_new}")
+ITERATION_LINE = "Iteration {iteration}: x = {x}"
+DIRECT_SOLVE_SIZE = 400 # До этого размера плотную систему дешевле решить LU, чем анализировать сходимость
+ANALYSIS_CACHE_SIZE = 32 # Записей в кеше анализа solve() (LRU)
+ANALYSIS_CACHE_BYTES = 256 * 2**20 # И не больше стольких байт кешированных факторизаций
+LU_BLOCK_SIZE = 64 # Ширина панели блочного LU: хвост обновляется матричным произведением
+BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
 
-        if max(abs(x_new[i] - x[i]) for i in range(n)) <= tolerance:
-            print(f"Jacobi Method converged in {iteration+1} iterations.")
-            return x_new
+class LUFactorization:
+    # PA = LU с частичным выбором главного элемента. Факторизуем один раз за O(n³),
+    # затем solve(B) решает для вектора или блока (n, k) правых частей за O(n²k).
+    # Блочный right-looking алгоритм: панель из block_size столбцов факторизуется по столбцам,
+    # затем хвостовая подматрица обновляется одним матричным произведением (BLAS) на блок.
+    # Входная матрица не изменяется, если не задан overwrite_a=True (тогда LU пишется в A без копии).
+    # dtype=np.float32 — вдвое меньше памяти и трафика (см. mixed_precision_solve).
+    def __init__(self, A, dtype=float, overwrite_a=False, block_size=LU_BLOCK_SIZE):
+        if sparse is not None and sparse.issparse(A):
+            A = A.toarray() # Плотное LU; для разреженных прямых решений см. solve()
+        if overwrite_a and isinstance(A, np.ndarray) and A.dtype == dtype and A.flags.writeable:
+            LU = A
+        else:
+            LU = np.array(A, dtype=dtype) # Копия, A пользователя не трогаем
+        n = LU.shape[0]
+        if LU.ndim != 2 or LU.shape[1] != n:
+            raise ValueError("LU factorization needs a square matrix.")
+        perm = np.arange(n)
+        sign = 1.0
+        absolute = np.abs(LU)
+        self.norm1 = float(absolute.sum(axis=0).max()) if n else 0.0 # ||A||_1 для оценки обусловленности
+        self.row_scale = absolute.max(axis=1) if n else np.ones(0) # D для уравновешенной оценки D⁻¹A
+        self.row_scale[self.row_scale == 0] = 1.0
+        self.scaled_norm1 = float((absolute / self.row_scale[:, np.newaxis]).sum(axis=0).max()) if n else 0.0
+        del absolute
 
-        x = x_new # Возвращает ответ, когда maximum change < tolerance
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            for i in range(start, stop): # Факторизация панели LU[start:, start:stop]
+                p = i + int(np.argmax(np.abs(LU[i:, i]))) # Строка с максимальным элементом в столбце
+                pivot = LU[p, i]
+                if pivot == 0: # Малый, но ненулевой элемент не ошибка: почти вырожденность видна по condition_estimate()
+                    raise np.linalg.LinAlgError(f"Matrix is singular (zero pivot in column {i}).")
+                if not np.isfinite(pivot):
+                    raise np.linalg.LinAlgError(f"Matrix has a non-finite entry (pivot {pivot} in column {i}).")
+                if p != i:
+                    LU[[i, p]] = LU[[p, i]] # Перестановка целых строк (и L слева, и ещё не обновлённой части справа)
+                    perm[[i, p]] = perm[[p, i]]
+                    sign = -sign
+                LU[i + 1:, i] /= LU[i, i] # Множители L
+                LU[i + 1:, i + 1:stop] -= np.outer(LU[i + 1:, i], LU[i, i + 1:stop]) # Обновление внутри панели
+            if stop < n:
+                for i in range(start, stop): # U12 = L11⁻¹ A12 (прямая подстановка по строкам блока)
+                    LU[i + 1:stop, stop:] -= np.outer(LU[i + 1:stop, i], LU[i, stop:])
+                LU[stop:, stop:] -= LU[stop:, start:stop] @ LU[start:stop, stop:] # A22 -= L21 U12
 
-    return x
+        self.LU = LU
+        self.perm = perm
+        self.sign = sign
+        self.n = n
+
+    def solve(self, B):
+        B = np.asarray(B, dtype=self.LU.dtype)
+        Y = B[self.perm].copy() # Применяем перестановку строк P
+        for i in range(1, self.n):
+            Y[i] -= self.LU[i, :i] @ Y[:i] # Прямая подстановка, L с единичной диагональю
+        for i in range(self.n - 1, -1, -1):
+            Y[i] = (Y[i] - self.LU[i, i + 1:] @ Y[i + 1:]) / self.LU[i, i] # Обратная подстановка
+        return Y
+
+    def solve_transposed(self, B):
+        Y = np.array(B, dtype=self.LU.dtype) # Решаем Aᵀx = b: Uᵀz = b, Lᵀw = z, x = Pᵀw
+        for i in range(self.n):
+            Y[i] = (Y[i] - self.LU[:i, i] @ Y[:i]) / self.LU[i, i]
+        for i in range(self.n - 2, -1, -1):
+            Y[i] -= self.LU[i + 1:, i] @ Y[i + 1:]
+        X = np.empty_like(Y)
+        X[self.perm] = Y
+        return X
+
+    def determinant(self):
+        return self.sign * np.prod(np.diag(self.LU).astype(float)) # det(A) = ±prod(diag(U))
+
+    def condition_estimate(self, equilibrated=False):
+        # Оценка cond_1(A) = ||A||_1 * ||A⁻¹||_1 по алгоритму Хагера (несколько решений, без A⁻¹).
+        # equilibrated=True — оценка для D⁻¹A, D = diag(max|a_ij| по строкам): не зависит от масштаба
+        # строк, так что хорошая, но плохо масштабированная система (diag(1e20, 1)) не вырождена.
+        if self.n == 0:
+            return 0.0
+        d = self.row_scale if equilibrated else 1.0 # (D⁻¹A)⁻¹ = A⁻¹D, (A⁻¹D)ᵀ = D A⁻ᵀ
+        x = np.full(self.n, 1.0 / self.n)
+        estimate = 0.0
+        for _ in range(5):
+            y = self.solve(d * x)
+            estimate = np.abs(y).sum()
+            z = d * self.solve_transposed(np.where(y >= 0, 1.0, -1.0))
+            j = int(np.argmax(np.abs(z)))
+            if abs(z[j]) <= z @ x:
+                break
+            x = np.zeros(self.n)
+            x[j] = 1.0
+        return float((self.scaled_norm1 if equilibrated else self.norm1) * estimate)
+
+    def singular_to_working_precision(self):
+        # rcond < n·eps по уравновешенной оценке: решение может не содержать ни одной верной цифры
+        condition = self.condition_estimate(equilibrated=True)
+        return condition * max(self.n, 1) * np.finfo(self.LU.dtype).eps >= 1
+
+@instrumented
+def gaussian_elimination(A, B, mixed_precision=False, overwrite_a=False): # Вход матрица и вектор
+    if mixed_precision: # LU во float32 + уточнение до точности float64
+        x = mixed_precision_solve(A, B).solution
+        return x.tolist() if x.ndim == 1 else x
+    lu = LUFactorization(A, overwrite_a=overwrite_a) # Forward elimination для приведения A к U (B не изменяется)
+    if lu.singular_to_working_precision():
+        raise np.linalg.LinAlgError(f"Matrix is singular to working precision "
+                                    f"(condition number estimate {lu.condition_estimate(equilibrated=True):.3g}).")
+    with phase("post-process"):
+        x = lu.solve(B) # Прямая и обратная подстановка
+
+    return x.tolist() if x.ndim == 1 else x # Возвращает решение
+
+@instrumented
+def mixed_precision_solve(A, B, max_refinements=10):
+    # Смешанная точность: LU во float32 (вдвое дешевле по памяти и времени), затем итерационное
+    # уточнение x += LU₃₂⁻¹(b − Ax), где невязка считается во float64. Сходится при cond(A)·eps₃₂ < 1;
+    # если оценка обусловленности это не гарантирует или уточнение застряло — честный LU во float64.
+    A = as_operator_matrix(A)
+    b = np.asarray(B, dtype=float)
+    single_eps = np.finfo(np.float32).eps
+    double_eps = np.finfo(np.float64).eps
+    b_norm = np.abs(b).max() or 1.0
+    residuals = []
+    message = ""
+
+    try:
+        lu = LUFactorization(A, dtype=np.float32)
+        condition = lu.condition_estimate()
+    except np.linalg.LinAlgError:
+        condition = np.inf
+    if condition * single_eps < 0.5:
+        x = lu.solve(b).astype(float)
+        A_norm = abs(A).sum(axis=1).max()
+        threshold = np.sqrt(A.shape[0]) * double_eps * A_norm # Критерий обратной ошибки как в LAPACK dsgesv
+        converged = False
+        with phase("refine"):
+            for refinement in range(max_refinements + 1):
+                r = b - A @ x # Невязка во float64
+                residual = np.abs(r).max()
+                residuals.append(residual / b_norm)
+                converged = residual <= threshold * np.abs(x).max()
+                if converged or (len(residuals) > 1 and residuals[-1] > 0.5 * residuals[-2]): # Готово или застой
+                    break
+                x += lu.solve(r) # Поправка с теми же множителями float32
+        if converged:
+            result = IterationResult(x, refinement, refinement + 1, residuals, True)
+            result.precision, result.condition = "mixed", condition
+            return result
+        message = f"refinement stalled at residual {residuals[-1]:.3g}"
+    else:
+        message = f"condition estimate {condition:.3g} is too large for float32 factors"
+
+    lu = LUFactorization(A) # Запасной путь: полный float64
+    x = lu.solve(b)
+    residuals.append(np.abs(b - A @ x).max() / b_norm)
+    result = IterationResult(x, 0, 1, residuals, True, f"Used float64 LU: {message}.")
+    result.precision, result.condition = "double", lu.condition_estimate()
+    return result
+
+def as_operator_matrix(A):
+    # Плотная NumPy матрица или scipy.sparse CSR; списки Python превращаются в массив
+    if sparse is not None and sparse.issparse(A):
+        return A.tocsr()
+    return np.asarray(A, dtype=float)
+
+@instrumented
+def jacobi_method(A, B, iterations=25, tolerance=1e-10, norm=np.inf, x0=None, trace=None):
+    # Матричная форма: x_new = D⁻¹(b − Rx) = x + D⁻¹(b − Ax), один matvec на итерацию.
+    # A — плотная матрица или scipy.sparse CSR. Останов по относительной невязке ||b − Ax|| / ||b||.
+    A = as_operator_matrix(A)
+    b = np.asarray(B, dtype=float)
+    D = A.diagonal()
+    if np.any(D == 0):
+        raise np.linalg.LinAlgError("Jacobi method needs a nonzero diagonal.")
+    trace = make_trace(trace) # По умолчанию ничего не печатается
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float) # Создаем массив нулей длины n
+    b_norm = np.linalg.norm(b, norm) or 1.0
+    r = b - A @ x
+    step = np.empty_like(b) # Буфер, чтобы не выделять память на каждой итерации
+    residuals = []
+
+    for iteration in range(1, iterations + 1):
+        np.divide(r, D, out=step)
+        x += step
+        np.subtract(b, A @ x, out=r) # Невязка нового x
+        residual = np.linalg.norm(r, norm) / b_norm
+        residuals.append(residual)
+        trace.record(iteration, x, residual)
+
+        if residual <= tolerance:
+            return IterationResult(x, iteration, iteration + 1, residuals, True, trace=trace)
 
-def gauss_seidel_method(A, B, iterations=25, tolerance=1e-10):
+    return IterationResult(x, iterations, iterations + 1, residuals, False,
+                           f"Jacobi Method did not converge in {iterations} iterations.", trace)
+
+@instrumented
+def parallel_jacobi_method(A, B, workers=None, iterations=25, tolerance=1e-10, norm=np.inf):
+    # Параллельный Якоби для плотных систем: строки делятся на блоки между процессами.
+    # A, b, диагональ и два буфера x (x и x_new) лежат в multiprocessing.shared_memory,
+    # так что на итерации ничего не копируется; процессы синхронизируются барьером.
+    # Каждый процесс считает свою часть невязки, и все одинаково решают, остановиться ли.
+    A = np.asarray(A, dtype=float)
+    n = A.shape[0]
+    workers = max(1, min(workers or os.cpu_count() or 1, n))
+    D = np.diag(A)
+    if np.any(D == 0):
+        raise np.linalg.LinAlgError("Jacobi method needs a nonzero diagonal.")
+
+    shapes = {"A": (n, n), "b": (n,), "D": (n,), "x": (2, n), "partial": (2, workers), "status": (3,)}
+    blocks = {name: shared_memory.SharedMemory(create=True, size=max(8, int(np.prod(shape)) * 8))
+              for name, shape in shapes.items()}
+    try:
+        arrays = {name: np.ndarray(shapes[name], dtype=float, buffer=blocks[name].buf) for name in shapes}
+        arrays["A"][:] = A # Единственное копирование A — в разделяемую память
+        arrays["b"][:] = B
+        arrays["D"][:] = D
+        arrays["x"][:] = 0.0
+        arrays["status"][:] = (0, iterations, np.nan)
+
+        barrier = multiprocessing.Barrier(workers)
+        bounds = np.linspace(0, n, workers + 1).astype(int)
+        names = {name: block.name for name, block in blocks.items()}
+        processes = [multiprocessing.Process(target=_jacobi_worker,
+                                             args=(names, shapes, w, bounds[w], bounds[w + 1], barrier,
+                                                   iterations, tolerance, norm))
+                     for w in range(workers)]
+        saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+        os.environ.update(dict.fromkeys(BLAS_THREAD_VARIABLES, "1")) # Наследуются процессами (fork или spawn)
+        try:
+            for process in processes:
+                process.start()
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+        for process in processes:
+            process.join()
+        if any(process.exitcode != 0 for process in processes):
+            raise RuntimeError("A parallel Jacobi worker failed.")
+
+        current, used, residual = arrays["status"]
+        x = arrays["x"][int(current)].copy()
+        residuals = [residual]
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    converged = residual <= tolerance
+    message = "" if converged else f"Jacobi Method did not converge in {iterations} iterations."
+    return IterationResult(x, int(used), int(used) + 1, residuals, converged, message)
+
+def blas_worker_setting():
+    # Каждый процесс с многопоточным BLAS занял бы все ядра: workers процессов × потоки BLAS > ядер.
+    # Описание того, как _limit_blas_threads ограничивает потоки в процессах parallel_jacobi_method.
+    if threadpool_limits is not None:
+        return "1 BLAS thread per worker (threadpoolctl)"
+    return f"{'/'.join(BLAS_THREAD_VARIABLES)}=1 in workers (install threadpoolctl to limit an already loaded BLAS)"
+
+def _limit_blas_threads():
+    # Инициализатор процесса: с threadpoolctl лимит в 1 поток ставится прямо в BLAS; без него
+    # действуют только переменные BLAS_THREAD_VARIABLES=1, выставленные родителем перед стартом.
+    if threadpool_limits is not None:
+        threadpool_limits(1)
+
+def _jacobi_worker(names, shapes, worker, start, stop, barrier, iterations, tolerance, norm):
+    _limit_blas_threads()
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, block_name in names.items()}
+    try:
+        arrays = {name: np.ndarray(shapes[name], dtype=float, buffer=blocks[name].buf) for name in shapes}
+        A_block = arrays["A"][start:stop] # Только свои строки A
+        b_block = arrays["b"][start:stop]
+        D_block = arrays["D"][start:stop]
+        x, partial, status = arrays["x"], arrays["partial"], arrays["status"]
+        b_norm = np.linalg.norm(arrays["b"], norm) or 1.0
+        r = np.empty(stop - start)
+
+        current = 0
+        for iteration in range(iterations + 1):
+            np.subtract(b_block, A_block @ x[current], out=r) # Невязка текущего x на своих строках
+            partial[iteration % 2, worker] = _partial_norm(r, norm)
+            if iteration < iterations:
+                x[1 - current, start:stop] = x[current, start:stop] + r / D_block
+            barrier.wait() # Все блоки x_new и части невязки готовы
+
+            residual = _combine_norms(partial[iteration % 2], norm) / b_norm
+            if residual <= tolerance or iteration == iterations:
+                if worker == 0:
+                    status[:] = (current, iteration, residual)
+                return
+            current = 1 - current # Меняем буферы местами
+    except BaseException:
+        barrier.abort() # Не оставляем остальных ждать на барьере
+        raise
+    finally:
+        for block in blocks.values():
+            block.close()
+
+def _partial_norm(r, norm):
+    if norm == np.inf:
+        return np.abs(r).max() if r.size else 0.0
+    return np.sum(np.abs(r) ** norm)
+
+def _combine_norms(partials, norm):
+    if norm == np.inf:
+        return partials.max()
+    return partials.sum() ** (1.0 / norm)
+
+def benchmark_parallel_jacobi(n=2000, workers=None, iterations=100, seed=0):
+    # Сравнение однопроцессного jacobi_method и parallel_jacobi_method на случайной
+    # плотной системе с диагональным преобладанием (одинаковое число итераций).
+    rng = np.random.default_rng(seed)
+    A = rng.uniform(-1, 1, (n, n))
+    A[np.diag_indices(n)] = np.abs(A).sum(axis=1) + 1
+    b = rng.uniform(-1, 1, n)
+
+    start = time.perf_counter()
+    serial = jacobi_method(A, b, iterations=iterations, tolerance=0.0)
+    serial_time = time.perf_counter() - start
+    start = time.perf_counter()
+    parallel = parallel_jacobi_method(A, b, workers=workers, iterations=iterations, tolerance=0.0)
+    parallel_time = time.perf_counter() - start
+
+    difference = np.abs(serial.solution - parallel.solution).max()
+    blas = {name: os.environ.get(name, "default") for name in BLAS_THREAD_VARIABLES}
+    print(f"n = {n}, {iterations} sweeps, {workers or os.cpu_count()} worker(s), {blas_worker_setting()}; "
+          f"single process BLAS threads: " + ", ".join(f"{name}={value}" for name, value in blas.items()))
+    print(f"Single process: {serial_time:.3f} s, parallel: {parallel_time:.3f} s, "
+          f"speedup {serial_time / parallel_time:.2f}x, max difference {difference:.2e}")
+    return serial_time, parallel_time
+
+@instrumented
+def gauss_seidel_method(A, B, iterations=25, tolerance=1e-10, trace=None):
+    if sparse is not None and sparse.issparse(A): # Разреженная матрица из файла: Gauss-Seidel по цветам (omega=1)
+        return multicolor_sor_method(A, B, omega=1.0, iterations=iterations, tolerance=tolerance, trace=trace)
+    A = np.asarray(A, dtype=float).tolist() # Массивы из файла -> списки Python float
+    B = np.asarray(B, dtype=float).tolist()
     n = len(A)
+    trace = make_trace(trace)
     x = [0] * n # Создаем массив нулей длины n
+    residuals = []
 
     for iteration in range(iterations):
         x_new = x[:]
@@ -59,18 +382,451 @@ def gauss_seidel_method(A, B, iterations=25, tolerance=1e-10):
             s2 = sum(A[i][j] * x[j] for j in range(i + 1, n)) # Вычисляет, используя старые значения
             x_new[i] = (B[i] - s1 - s2) / A[i][i]
 
-        print(f"Iteration {iteration+1}: x = {x_new}")
+        change = max(abs(x_new[i] - x[i]) for i in range(n))
+        residuals.append(change)
+        trace.record(iteration + 1, x_new, change)
 
-        if max(abs(x_new[i] - x[i]) for i in range(n)) <= tolerance:
-            print(f"Gauss-Seidel Method converged in {iteration+1} iterations.")
-            return x_new
+        if change <= tolerance:
+            return IterationResult(x_new, iteration + 1, iteration + 1, residuals, True, trace=trace)
 
         x = x_new
 
+    return IterationResult(x, iterations, iterations, residuals, False,
+                           f"Gauss-Seidel Method did not converge in {iterations} iterations.", trace)
+
+def greedy_coloring(A):
+    # Жадная раскраска графа разреженности (A + Aᵀ): строки одного цвета не связаны,
+    # поэтому их можно обновлять одновременно. Для сетки 5-точечного шаблона — 2 цвета (red-black).
+    if sparse is not None and sparse.issparse(A):
+        pattern = (abs(A) + abs(A).T).tocsr()
+    else:
+        dense = np.asarray(A, dtype=float)
+        pattern = (dense != 0) | (dense.T != 0)
+    n = pattern.shape[0]
+    colors = np.full(n, -1)
+    for i in range(n):
+        if sparse is not None and sparse.issparse(pattern):
+            neighbours = pattern.indices[pattern.indptr[i]:pattern.indptr[i + 1]]
+        else:
+            neighbours = np.flatnonzero(pattern[i])
+        used = set(colors[neighbours].tolist())
+        color = 0
+        while color in used:
+            color += 1
+        colors[i] = color
+    return colors
+
+def is_symmetric(A, tolerance=1e-12):
+    if sparse is not None and sparse.issparse(A):
+        difference = abs(A - A.T)
+        return difference.nnz == 0 or difference.max() <= tolerance * abs(A).max()
+    A = np.asarray(A)
+    return np.allclose(A, A.T, rtol=0, atol=tolerance * np.abs(A).max())
+
+def estimate_jacobi_spectral_radius(A, steps=50, seed=0):
+    # Оценка ρ(I − D⁻¹A) — матрицы итераций Якоби.
+    # Симметричная A с D > 0: метод Ланцоша для D^-1/2 A D^-1/2 (крайние собственные
+    # значения сходятся быстро). Иначе — степенной метод.
+    A = as_operator_matrix(A)
+    D = A.diagonal()
+    n = A.shape[0]
+    v = np.random.default_rng(seed).uniform(-1, 1, n)
+    v /= np.linalg.norm(v)
+
+    if np.all(D > 0) and is_symmetric(A):
+        scale = 1 / np.sqrt(D)
+        alphas, betas = [], []
+        v_previous, beta = np.zeros(n), 0.0
+        for _ in range(min(steps, n)):
+            w = scale * (A @ (scale * v)) - beta * v_previous
+            alpha = v @ w
+            w -= alpha * v
+            beta = np.linalg.norm(w)
+            alphas.append(alpha)
+            if beta < 1e-12:
+                break
+            betas.append(beta)
+            v_previous, v = v, w / beta
+        k = len(alphas)
+        T = np.diag(alphas) + np.diag(betas[:k - 1], 1) + np.diag(betas[:k - 1], -1)
+        eigenvalues = np.linalg.eigvalsh(T)
+        return max(abs(1 - eigenvalues[0]), abs(1 - eigenvalues[-1]))
+
+    radius = 0.0
+    for _ in range(steps):
+        w = v - (A @ v) / D
+        radius = np.linalg.norm(w)
+        if radius == 0:
+            break
+        v = w / radius
+    return radius
+
+def optimal_sor_omega(A, steps=100):
+    # ω_opt = 2 / (1 + sqrt(1 − ρ_J²)) для согласованно упорядоченных матриц (например, red-black)
+    radius = estimate_jacobi_spectral_radius(A, steps)
+    if radius >= 1:
+        return 1.0
+    return 2.0 / (1.0 + np.sqrt(1.0 - radius * radius))
+
+@instrumented
+def multicolor_sor_method(A, B, omega=1.0, symmetric=False, iterations=25, tolerance=1e-10, norm=np.inf,
+                          colors=None, x0=None, trace=None):
+    # Gauss-Seidel / SOR / SSOR по цветам: все строки одного цвета обновляются одной
+    # векторной операцией. omega=1 — Gauss-Seidel, omega="auto" — оценка ω_opt,
+    # symmetric=True — SSOR (прямой проход по цветам, затем обратный).
+    A = as_operator_matrix(A)
+    b = np.asarray(B, dtype=float)
+    order = _sor_sweep_order(A, omega, symmetric, colors)
+
+    trace = make_trace(trace)
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float)
+    b_norm = np.linalg.norm(b, norm) or 1.0
+    residuals = []
+
+    for iteration in range(1, iterations + 1):
+        _sor_sweep(x, b, order)
+        residual = np.linalg.norm(b - A @ x, norm) / b_norm
+        residuals.append(residual)
+        trace.record(iteration, x, residual)
+
+        if residual <= tolerance:
+            return IterationResult(x, iteration, iteration, residuals, True, trace=trace)
+
+    return IterationResult(x, iterations, iterations, residuals, False,
+                           f"SOR method did not converge in {iterations} iterations.", trace)
+
+def _sor_sweep_order(A, omega, symmetric, colors):
+    D = A.diagonal()
+    if np.any(D == 0):
+        raise np.linalg.LinAlgError("Gauss-Seidel method needs a nonzero diagonal.")
+    if omega == "auto":
+        omega = optimal_sor_omega(A)
+    if colors is None:
+        colors = greedy_coloring(A)
+    classes = [np.flatnonzero(colors == color) for color in range(colors.max() + 1)]
+    blocks = [(rows, A[rows], omega / D[rows]) for rows in classes] # Строки A по цветам, готовятся один раз
+    return blocks + blocks[::-1] if symmetric else blocks
+
+def _sor_sweep(x, b, order):
+    for rows, A_rows, scale in order:
+        x[rows] += scale * (b[rows] - A_rows @ x) # Обновляем целый цвет сразу
     return x
 
+def as_matvec(A):
+    # Матрица (плотная, CSR), scipy LinearOperator или просто функция v -> A @ v
+    if hasattr(A, "matvec"):
+        return A.matvec
+    if callable(A):
+        return A
+    A = as_operator_matrix(A)
+    return lambda v: A @ v
+
+def make_preconditioner(A, kind, omega=1.0, symmetric=False):
+    # Предобуславливатель — функция r -> z ≈ A⁻¹r:
+    # None, "jacobi" (диагональ), "ssor" (один симметричный проход multicolor SOR из нуля),
+    # "ilu" (неполное LU из scipy для разреженных, точное LU для плотных) или своя функция.
+    # symmetric=True (для CG): ILU строится в симметричном режиме и симметризуется.
+    if kind is None or callable(kind):
+        return kind
+    if callable(A) or hasattr(A, "matvec"):
+        raise ValueError("Matrix-free systems need a preconditioner function, not a name.")
+    A = as_operator_matrix(A)
+    if kind == "jacobi":
+        inverse_diagonal = 1.0 / A.diagonal()
+        return lambda r: inverse_diagonal * r
+    if kind == "ssor":
+        order = _sor_sweep_order(A, omega, True, None)
+        return lambda r: _sor_sweep(np.zeros_like(r), r, order)
+    if kind == "ilu":
+        if sparse is not None and sparse.issparse(A):
+            if not symmetric:
+                return sparse_linalg.spilu(A.tocsc()).solve
+            factors = sparse_linalg.spilu(A.tocsc(), permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0,
+                                          options={"SymmetricMode": True})
+            return lambda r: 0.5 * (factors.solve(r) + factors.solve(r, "T"))
+        return LUFactorization(A).solve
+    raise ValueError(f"Unknown preconditioner: {kind!r}")
+
+@instrumented
+def conjugate_gradient_method(A, B, preconditioner=None, iterations=1000, tolerance=1e-10, x0=None, trace=None):
+    # Метод сопряженных градиентов (с предобуславливанием) для симметричных положительно
+    # определенных A. A может быть функцией matvec. Останов по ||b − Ax||₂ / ||b||₂.
+    matvec = as_matvec(A)
+    precondition = make_preconditioner(A, preconditioner, symmetric=True)
+    b = np.asarray(B, dtype=float)
+    trace = make_trace(trace)
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float)
+    b_norm = np.linalg.norm(b) or 1.0
+    r = b - matvec(x) if x0 is not None else b.copy()
+    z = precondition(r) if precondition else r
+    p = z.copy()
+    rz = r @ z
+    matvecs = 1 if x0 is not None else 0
+    residual = np.linalg.norm(r) / b_norm
+    if residual <= tolerance: # b = 0 или точный x0: решать нечего (иначе p = 0 и pᵀAp = 0)
+        return IterationResult(x, 0, matvecs, [residual], True, trace=trace)
+    residuals = []
+
+    for iteration in range(1, iterations + 1):
+        Ap = matvec(p)
+        matvecs += 1
+        curvature = p @ Ap
+        if curvature <= 0:
+            reason = ("matrix is not positive definite" if np.any(p)
+                      else "the search direction vanished (is the preconditioner singular?)")
+            return IterationResult(x, iteration - 1, matvecs, residuals, False,
+                                   f"Conjugate gradient breakdown: {reason}.", trace)
+        alpha = rz / curvature
+        x += alpha * p
+        r -= alpha * Ap
+        residual = np.linalg.norm(r) / b_norm
+        residuals.append(residual)
+        trace.record(iteration, x, residual)
+        if residual <= tolerance:
+            return IterationResult(x, iteration, matvecs, residuals, True, trace=trace)
+
+        z = precondition(r) if precondition else r
+        rz_new = r @ z
+        p = z + (rz_new / rz) * p # Новое сопряженное направление
+        rz = rz_new
+
+    return IterationResult(x, iterations, matvecs, residuals, False,
+                           f"Conjugate gradient did not converge in {iterations} iterations.", trace)
+
+@instrumented
+def gmres_method(A, B, preconditioner=None, restart=30, iterations=1000, tolerance=1e-10, x0=None, trace=None):
+    # GMRES(restart) с правым предобуславливанием для произвольных (несимметричных) A.
+    # Базис Крылова строится модифицированным Грамом-Шмидтом, задача наименьших квадратов
+    # решается вращениями Гивенса, поэтому невязка известна на каждом шаге без лишних matvec.
+    matvec = as_matvec(A)
+    precondition = make_preconditioner(A, preconditioner) or (lambda v: v)
+    b = np.asarray(B, dtype=float)
+    n = b.shape[0]
+    trace = make_trace(trace)
+    x = np.zeros_like(b) if x0 is None else np.array(x0, dtype=float)
+    b_norm = np.linalg.norm(b) or 1.0
+    matvecs = 0
+    residuals = []
+    iteration = 0
+    m = min(restart, n)
+
+    while iteration < iterations:
+        r = b - matvec(x)
+        matvecs += 1
+        beta = np.linalg.norm(r)
+        if beta / b_norm <= tolerance:
+            return IterationResult(x, iteration, matvecs, residuals, True, trace=trace)
+
+        V = np.zeros((m + 1, n))
+        H = np.zeros((m + 1, m))
+        cs, sn = np.zeros(m), np.zeros(m)
+        g = np.zeros(m + 1)
+        V[0] = r / beta
+        g[0] = beta
+
+        for j in range(m):
+            w = matvec(precondition(V[j]))
+            matvecs += 1
+            for i in range(j + 1):
+                H[i, j] = w @ V[i]
+                w -= H[i, j] * V[i]
+            H[j + 1, j] = subdiagonal = np.linalg.norm(w)
+            if subdiagonal > 0:
+                V[j + 1] = w / subdiagonal
+
+            for i in range(j): # Применяем прежние вращения к новому столбцу
+                H[i, j], H[i + 1, j] = cs[i] * H[i, j] + sn[i] * H[i + 1, j], -sn[i] * H[i, j] + cs[i] * H[i + 1, j]
+            denominator = np.hypot(H[j, j], H[j + 1, j])
+            cs[j], sn[j] = H[j, j] / denominator, H[j + 1, j] / denominator
+            H[j, j], H[j + 1, j] = denominator, 0.0
+            g[j], g[j + 1] = cs[j] * g[j], -sn[j] * g[j]
+
+            iteration += 1
+            residual = abs(g[j + 1]) / b_norm
+            residuals.append(residual)
+            if residual <= tolerance or iteration >= iterations or subdiagonal == 0: # 0 — точное решение в подпространстве
+                break
+
+        k = j + 1
+        y = np.linalg.solve(np.triu(H[:k, :k]), g[:k])
+        x += precondition(V[:k].T @ y)
+        trace.record(iteration, x, residuals[-1])
+
+    r = b - matvec(x)
+    residual = np.linalg.norm(r) / b_norm
+    converged = residual <= tolerance
+    message = "" if converged else f"GMRES did not converge in {iterations} iterations."
+    return IterationResult(x, iteration, matvecs + 1, residuals, converged, message, trace)
+
+class MatrixAnalysis:
+    # Дешёвый анализ матрицы для solve(): размер, заполненность, симметрия, знак диагонали,
+    # диагональное преобладание и оценка ρ(I − D⁻¹A) несколькими шагами (Ланцош / степенной метод).
+    # По результатам выбирается метод; причина выбора сохраняется в reason.
+    def __init__(self, A, radius_steps=20):
+        self.n = A.shape[0]
+        self.is_sparse = sparse is not None and sparse.issparse(A)
+        self.nnz = A.nnz if self.is_sparse else int(np.count_nonzero(A))
+        self.density = self.nnz / (self.n * self.n) if self.n else 1.0
+        D = A.diagonal()
+        absolute = abs(A)
+        off_diagonal = np.asarray(absolute.sum(axis=1)).ravel() - np.abs(D)
+        self.zero_diagonal = bool(np.any(D == 0))
+        self.positive_diagonal = bool(np.all(D > 0))
+        self.symmetric = is_symmetric(A)
+        self.diagonally_dominant = bool(np.all(np.abs(D) > off_diagonal))
+        self.jacobi_radius = np.inf if self.zero_diagonal else estimate_jacobi_spectral_radius(A, radius_steps)
+        self.method, self.reason = self._choose()
+        self.factorization = None # LU для прямого метода, строится при первом решении и кешируется
+
+    def _choose(self):
+        if not self.is_sparse and self.n <= DIRECT_SOLVE_SIZE:
+            return "lu", f"small dense system (n = {self.n}): direct LU is cheaper than iterating"
+        if self.symmetric and self.positive_diagonal:
+            return "cg", "symmetric with positive diagonal: Jacobi-preconditioned conjugate gradient"
+        if self.diagonally_dominant:
+            return "gauss-seidel", "strictly diagonally dominant: multicolor Gauss-Seidel is guaranteed to converge"
+        if self.jacobi_radius < 1:
+            return "jacobi", f"Jacobi iteration matrix has spectral radius ~{self.jacobi_radius:.3f} < 1"
+        if self.is_sparse:
+            return "gmres", "sparse, not diagonally dominant: ILU-preconditioned GMRES"
+        return "lu", "dense and no stationary method is expected to converge: direct LU"
+
+    @property
+    def factorization_bytes(self):
+        # Память кешированной факторизации: плотное LU или L и U из splu
+        factors = self.factorization
+        if factors is None:
+            return 0
+        if isinstance(factors, LUFactorization):
+            return factors.LU.nbytes + factors.perm.nbytes
+        return sum(part.data.nbytes + part.indices.nbytes + part.indptr.nbytes for part in (factors.L, factors.U))
+
+    def iteration_budget(self, tolerance, radius):
+        # Сколько итераций нужно при скорости сходимости radius (с запасом), не больше 10000
+        if not 0 < radius < 1:
+            return 1000
+        return int(min(10000, 2 * np.ceil(np.log(tolerance) / np.log(radius)) + 10))
+
+    def __repr__(self):
+        return (f"MatrixAnalysis(n={self.n}, density={self.density:.3g}, symmetric={self.symmetric}, "
+                f"diagonally_dominant={self.diagonally_dominant}, jacobi_radius={self.jacobi_radius:.3g}, "
+                f"method={self.method!r})")
+
+_ANALYSIS_CACHE = collections.OrderedDict()
+
+def _solve_gmres(A, b, tolerance, trace):
+    try:
+        return gmres_method(A, b, preconditioner="ilu", tolerance=tolerance, trace=trace)
+    except RuntimeError as e: # spilu не смог построить неполное LU
+        return IterationResult(np.zeros_like(b), 0, 0, [], False, f"ILU preconditioner failed: {e}")
+
+def matrix_fingerprint(A):
+    # Хеш содержимого матрицы (форма, тип, данные; для CSR — ещё структура разреженности)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((A.shape, str(A.dtype), type(A).__name__)).encode())
+    if sparse is not None and sparse.issparse(A):
+        A = A.tocsr()
+        if not A.has_canonical_format: # Каноническая форма на копии: матрицу пользователя не меняем
+            A = A.copy()
+            A.sum_duplicates()
+        for part in (A.indptr, A.indices, A.data):
+            digest.update(np.ascontiguousarray(part).tobytes())
+    else:
+        digest.update(np.ascontiguousarray(A).tobytes())
+    return digest.hexdigest()
+
+def analyze_matrix(A):
+    # Анализ с кешем по отпечатку: повторное решение с той же матрицей его пропускает (LRU)
+    A = as_operator_matrix(A)
+    key = matrix_fingerprint(A)
+    if key in _ANALYSIS_CACHE:
+        _ANALYSIS_CACHE.move_to_end(key)
+        return _ANALYSIS_CACHE[key]
+    analysis = MatrixAnalysis(A)
+    _ANALYSIS_CACHE[key] = analysis
+    _trim_analysis_cache(analysis)
+    return analysis
+
+def _trim_analysis_cache(current):
+    # Вытесняем самые старые записи, пока их больше ANALYSIS_CACHE_SIZE или факторизации занимают
+    # больше ANALYSIS_CACHE_BYTES. current (последняя использованная) не вытесняется, но её
+    # факторизация не кешируется, если одна превышает лимит.
+    total = sum(analysis.factorization_bytes for analysis in _ANALYSIS_CACHE.values())
+    while len(_ANALYSIS_CACHE) > ANALYSIS_CACHE_SIZE or total > ANALYSIS_CACHE_BYTES:
+        oldest = next(iter(_ANALYSIS_CACHE.values()))
+        if oldest is current:
+            break
+        _ANALYSIS_CACHE.popitem(last=False)
+        total -= oldest.factorization_bytes
+    if total > ANALYSIS_CACHE_BYTES:
+        current.factorization = None
+
+def clear_analysis_cache():
+    _ANALYSIS_CACHE.clear()
+
+@instrumented
+def solve(A, B, tolerance=1e-10, trace=None):
+    # Единая точка входа: анализирует A (с кешем), выбирает самый быстрый метод, который
+    # должен сойтись, и при неудаче переходит к надёжному запасному (GMRES / LU).
+    # В результате: method — использованный метод, reason — почему он выбран, analysis — анализ.
+    A = as_operator_matrix(A)
+    b = np.asarray(B, dtype=float)
+    with phase("analyze"):
+        analysis = analyze_matrix(A)
+    method, reason = analysis.method, analysis.reason
+
+    result = None
+    if method == "cg":
+        result = conjugate_gradient_method(A, b, preconditioner="jacobi", tolerance=tolerance, trace=trace)
+    elif method == "gauss-seidel":
+        budget = analysis.iteration_budget(tolerance, analysis.jacobi_radius) # ρ_GS ≤ ρ_J при преобладании
+        result = multicolor_sor_method(A, b, iterations=budget, tolerance=tolerance, norm=2, trace=trace)
+    elif method == "jacobi":
+        budget = analysis.iteration_budget(tolerance, analysis.jacobi_radius)
+        result = jacobi_method(A, b, iterations=budget, tolerance=tolerance, norm=2, trace=trace)
+    elif method == "gmres":
+        result = _solve_gmres(A, b, tolerance, trace)
+
+    if result is not None and not result.converged: # Запасной вариант
+        reason += f"; fell back after {method} failed ({result.message})"
+        method, result = "lu", None
+        if analysis.is_sparse and analysis.method != "gmres":
+            method, result = "gmres", _solve_gmres(A, b, tolerance, trace)
+            if not result.converged:
+                reason += f"; fell back after gmres failed ({result.message})"
+                method, result = "lu", None
+
+    if result is None: # Прямой метод: плотное LU или разреженное splu, факторизация кешируется
+        if analysis.factorization is None:
+            if analysis.is_sparse:
+                try:
+                    analysis.factorization = sparse_linalg.splu(A.tocsc())
+                except RuntimeError as e: # "Factor is exactly singular"
+                    raise np.linalg.LinAlgError(f"Matrix is singular ({e}).")
+            else:
+                analysis.factorization = LUFactorization(A)
+        x = analysis.factorization.solve(b)
+        _trim_analysis_cache(analysis)
+        residual = np.linalg.norm(b - A @ x) / (np.linalg.norm(b) or 1.0)
+        converged = bool(residual <= tolerance)
+        message = "" if converged else f"Direct solve left residual {residual:.3g}: matrix is (nearly) singular."
+        result = IterationResult(x, 1, 1, [residual], converged, message, make_trace(trace))
+
+    result.method = method
+    result.reason = reason
+    result.analysis = analysis
+    return result
+
 def get_user_input():
-    n = int(input("Enter the number of equations: "))
+    answer = input("Enter the number of equations (or a .csv/.txt/.mtx/.npy file with [A | b], "
+                   "optionally followed by a right-hand side file): ").strip()
+    if not answer.isdigit(): # Загрузка из файла: без копий в списки, .npy открывается через mmap
+        try:
+            return load_system(*shlex.split(answer)[:2])
+        except (OSError, ValueError, ImportError) as e:
+            print("Инвалид file!", e)
+            return None, None
+    n = int(answer)
     A = []
     B = []
     
@@ -90,27 +846,80 @@ def get_user_input():
     
     return A, B
 
+def report_iterative_result(method_name, result):
+    if result.converged:
+        print(f"{method_name} converged in {result.iterations} iterations.")
+    else:
+        print(result.message)
+    print(f"Solution using {method_name}:", result.solution)
+
 def main():
     print("Choose a method to solve the system of linear equations:")
     print("1 - Gaussian Elimination (Exact solution)")
     print("2 - Jacobi Method")
     print("3 - Gauss-Seidel Method")
+    print("4 - Benchmark parallel Jacobi on a random system")
+    print("5 - Multicolor SOR (Gauss-Seidel with automatic over-relaxation)")
+    print("6 - Conjugate Gradient (symmetric positive definite A, Jacobi preconditioner)")
+    print("7 - GMRES (any nonsingular A, Jacobi preconditioner)")
+    print("8 - Automatic (analyse the matrix and pick a method)")
+    print("9 - Gaussian Elimination in mixed precision (float32 LU + float64 refinement)")
 
     choice = input("Enter the method number: ")
+    if choice == "4":
+        n = int(input("Matrix size n: "))
+        workers = int(input("Number of worker processes: "))
+        benchmark_parallel_jacobi(n, workers)
+        return
     A, B = get_user_input()
     if A is None or B is None:
         print("Инвалид input! Exiting.")
         return
 
     if choice == "1":
-        result = gaussian_elimination(A, B)
+        try:
+            lu = LUFactorization(A)
+        except np.linalg.LinAlgError as e:
+            print("Инвалид! Matrix is singular:", e)
+            return
+        result = lu.solve(B).tolist()
+        condition = lu.condition_estimate()
         print("Solution using Gaussian Elimination:", result)
+        print(f"Determinant: {lu.determinant():.6g}, condition number estimate: {condition:.3g}")
+        if lu.singular_to_working_precision():
+            print("Внимание: matrix is singular to working precision, the solution may be meaningless.")
     elif choice == "2":
-        result = jacobi_method(A, B)
-        print("Solution using Jacobi Method:", result)
+        result = jacobi_method(A, B, trace=PrintTrace(ITERATION_LINE))
+        report_iterative_result("Jacobi Method", result)
     elif choice == "3":
-        result = gauss_seidel_method(A, B)
-        print("Solution using Gauss-Seidel Method:", result)
+        result = gauss_seidel_method(A, B, trace=PrintTrace(ITERATION_LINE))
+        report_iterative_result("Gauss-Seidel Method", result)
+    elif choice == "5":
+        result = multicolor_sor_method(A, B, omega="auto", trace=PrintTrace(ITERATION_LINE))
+        report_iterative_result("Multicolor SOR", result)
+    elif choice == "6":
+        result = conjugate_gradient_method(A, B, preconditioner="jacobi", trace=PrintTrace(ITERATION_LINE))
+        report_iterative_result("Conjugate Gradient", result)
+    elif choice == "7":
+        result = gmres_method(A, B, preconditioner="jacobi", trace=PrintTrace(ITERATION_LINE))
+        report_iterative_result("GMRES", result)
+    elif choice == "8":
+        try:
+            result = solve(A, B)
+        except np.linalg.LinAlgError as e:
+            print("Инвалид! Matrix is singular:", e)
+            return
+        print(f"Chosen method: {result.method} ({result.reason})")
+        report_iterative_result(result.method, result)
+    elif choice == "9":
+        try:
+            result = mixed_precision_solve(A, B)
+        except np.linalg.LinAlgError as e:
+            print("Инвалид! Matrix is singular:", e)
+            return
+        print(result.message or f"float32 LU + {result.iterations} refinement steps, "
+                                  f"condition number estimate: {result.condition:.3g}")
+        print("Solution using mixed precision:", result.solution.tolist())
     else:
         print("Инвалид!")
 
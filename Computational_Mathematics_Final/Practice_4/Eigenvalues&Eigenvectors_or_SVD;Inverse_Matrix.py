@@ -1,47 +1,593 @@
+import os
+import sys
 import numpy as np
 
-def compute_matrix_decomposition(matrix):
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import instrumented
+from tracing import IterationResult
+from loaders import load_matrix
+
+try:
+    import scipy.linalg as scipy_linalg
+    import scipy.sparse as scipy_sparse
+    import scipy.sparse.linalg as sparse_linalg
+except ImportError:  # scipy only speeds up the top-k case and sparse shift-invert
+    scipy_linalg = scipy_sparse = sparse_linalg = None
+
+KRYLOV_GROW_EVERY = 20  # Restarts between doublings of the Krylov basis when sparse_eigen_decomposition may grow it
+KRYLOV_MAX_NCV_FACTOR = 4  # compute_matrix_decomposition lets the basis grow to this many times ARPACK's 2k + 1
+
+def as_dense_matrix(matrix):
+    """
+    Returns the matrix as a 2D array without copying arrays (including
+    memory-mapped ones); sparse matrices are densified.
+    """
+    if hasattr(matrix, "toarray"):
+        return matrix.toarray()
+    return np.asarray(matrix)
+
+def is_hermitian(matrix, tolerance=1e-12):
+    """
+    True if the square matrix equals its conjugate transpose (symmetric if real).
+    """
+    scale = np.abs(matrix).max() if matrix.size else 0.0
+    return np.allclose(matrix, matrix.conj().T, rtol=0, atol=tolerance * scale)
+
+def is_matrix_batch(matrix):
+    """
+    True for a 3D array (stack of matrices) or a list of 2D matrices.
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix.ndim == 3
+    return isinstance(matrix, (list, tuple)) and len(matrix) > 0 and np.ndim(matrix[0]) == 2
+
+def map_batches(matrices, function):
+    """
+    Applies function to stacks of equally shaped matrices. A 3D array is one
+    stack; a list is grouped by shape, each group is stacked, and the result
+    is a list of per-matrix tuples in the input order.
+    """
+    if isinstance(matrices, np.ndarray):
+        return function(matrices)
+    groups = {}
+    for index, matrix in enumerate(matrices):
+        groups.setdefault(np.shape(matrix), []).append(index)
+    results = [None] * len(matrices)
+    for indices in groups.values():
+        parts = function(np.stack([np.asarray(matrices[index]) for index in indices]))
+        for position, index in enumerate(indices):
+            results[index] = tuple(part[position] for part in parts)
+    return results
+
+def hermitian_mask(stack, tolerance=1e-12):
+    """
+    Per-matrix is_hermitian for a (k, n, n) stack.
+    """
+    scale = np.abs(stack).max(axis=(1, 2), initial=0.0)
+    difference = np.abs(stack - stack.conj().swapaxes(1, 2)).max(axis=(1, 2), initial=0.0)
+    return difference <= tolerance * scale
+
+def decompose_stack(stack, k=None):
+    """
+    compute_matrix_decomposition for a (count, rows, cols) stack with the
+    stacked LAPACK routines: eigh for the Hermitian matrices, eig for the
+    rest (complex results if there are any), economy SVD if not square.
+    """
+    count, rows, cols = stack.shape
+    if k is not None and not 0 < k <= min(rows, cols):
+        raise ValueError(f"k must be between 1 and {min(rows, cols)}.")
+    if rows != cols:
+        U, S, Vt = np.linalg.svd(stack, full_matrices=False)
+        return (U, S, Vt) if k is None else (U[:, :, :k], S[:, :k], Vt[:, :k])
+
+    hermitian = hermitian_mask(stack)
+    if hermitian.all():
+        eigenvalues, eigenvectors = np.linalg.eigh(stack)
+        if k is None:
+            return eigenvalues, eigenvectors
+        return eigenvalues[:, ::-1][:, :k], eigenvectors[:, :, ::-1][:, :, :k]
+    eigenvalues = np.empty((count, rows), dtype=complex)
+    eigenvectors = np.empty((count, rows, rows), dtype=complex)
+    eigenvalues[~hermitian], eigenvectors[~hermitian] = np.linalg.eig(stack[~hermitian])
+    if hermitian.any():
+        eigenvalues[hermitian], eigenvectors[hermitian] = np.linalg.eigh(stack[hermitian])
+    if k is None:
+        return eigenvalues, eigenvectors
+    key = np.where(hermitian[:, np.newaxis], -eigenvalues.real, -np.abs(eigenvalues))
+    order = np.argsort(key, axis=1, kind="stable")[:, :k]
+    return (np.take_along_axis(eigenvalues, order, axis=1),
+            np.take_along_axis(eigenvectors, order[:, np.newaxis, :], axis=2))
+
+@instrumented
+def compute_matrix_decomposition(matrix, k=None, method="exact"):
     """
     If matrix is square or not.
-    If square, computes Eigenvalues & Eigenvectors.
-    If not, performs Singular Value Decomposition (SVD).
+    If square, computes Eigenvalues & Eigenvectors: eigh for symmetric/Hermitian
+    input, general eig otherwise. Returns (eigenvalues, eigenvectors).
+    If not, performs economy Singular Value Decomposition (SVD). Returns (U, S, Vt).
+    With k, only the top-k pairs are computed where possible and returned largest
+    first (largest eigenvalues for eigh, largest in magnitude for eig).
+    Sparse square input with k < n goes to sparse_eigen_decomposition
+    instead of being densified. A stack (count, rows, cols) or a list of
+    matrices is decomposed in batched calls (see decompose_stack, map_batches).
+    A tall memory-mapped matrix with k uses streaming_svd: exact (TSQR) by
+    default, or an approximation with method="randomized".
     """
-    matrix = np.array(matrix)
+    if is_matrix_batch(matrix):
+        return map_batches(matrix, lambda stack: decompose_stack(stack, k))
+    if isinstance(matrix, np.memmap) and matrix.ndim == 2 and matrix.shape[0] > matrix.shape[1] and k is not None:
+        return streaming_svd(matrix, k, method=method)  # Tall matrix on disk: read in row blocks, never loaded whole
+    if hasattr(matrix, "toarray") and matrix.shape[0] == matrix.shape[1] and k is not None and k < matrix.shape[0]:
+        result = sparse_eigen_decomposition(matrix, k, which=sparse_eigen_target(matrix),
+                                            max_ncv=KRYLOV_MAX_NCV_FACTOR * max(2 * k + 1, 20))
+        if not result.converged:  # Unconverged Ritz pairs are not eigenpairs; call sparse_eigen_decomposition to inspect them
+            raise np.linalg.LinAlgError(result.message)
+        return result.solution
+    matrix = as_dense_matrix(matrix)
     rows, cols = matrix.shape
+    if k is not None and not 0 < k <= min(rows, cols):
+        raise ValueError(f"k must be between 1 and {min(rows, cols)}.")
 
     if rows == cols:  # If matrix is square, compute eigenvalues & eigenvectors
-        print("\nMatrix is square, computing eigenvalues and eigenvectors...")
-        eigenvalues, eigenvectors = np.linalg.eig(matrix)
-        print("\nEigenvalues:", eigenvalues)
-        print("\nEigenvectors:\n", eigenvectors)
-    else:
-        print("\nMatrix is not square, performing Singular Value Decomposition (SVD)...")
-        U, S, Vt = np.linalg.svd(matrix)
-        print("\nU (Left Singular Vectors):\n", U)
-        print("\nSingular Values:\n", S)
-        print("\nV^T (Right Singular Vectors Transposed):\n", Vt)
+        if is_hermitian(matrix):
+            if k is None:
+                return np.linalg.eigh(matrix)
+            if scipy_linalg is not None:  # Only the k largest eigenpairs are computed
+                eigenvalues, eigenvectors = scipy_linalg.eigh(matrix, subset_by_index=[rows - k, rows - 1])
+            else:
+                eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+                eigenvalues, eigenvectors = eigenvalues[-k:], eigenvectors[:, -k:]
+            return eigenvalues[::-1], eigenvectors[:, ::-1]
+        if k is not None and sparse_linalg is not None and k < rows - 1:  # ARPACK, top-k by magnitude
+            eigenvalues, eigenvectors = sparse_linalg.eigs(matrix, k=k, which="LM")
+        else:
+            eigenvalues, eigenvectors = np.linalg.eig(matrix)
+        if k is None:
+            return eigenvalues, eigenvectors
+        order = np.argsort(-np.abs(eigenvalues))[:k]
+        return eigenvalues[order], eigenvectors[:, order]
+
+    if k is not None and sparse_linalg is not None and k < min(rows, cols) - 1:  # Truncated SVD
+        U, S, Vt = sparse_linalg.svds(matrix, k=k)
+        order = np.argsort(-S)
+        return U[:, order], S[order], Vt[order]
+    U, S, Vt = np.linalg.svd(matrix, full_matrices=False)  # Economy SVD: U is rows x min(rows, cols)
+    if k is not None:
+        return U[:, :k], S[:k], Vt[:k]
+    return U, S, Vt
 
-def compute_matrix_inverse(matrix):
+def row_blocks(matrix, block_rows):
     """
-    Computes the inverse of a square matrix if it is invertible.
+    Yields (start, block) for consecutive row blocks as float arrays; for a
+    memory map only one block is read into memory at a time.
     """
-    matrix = np.array(matrix)
+    for start in range(0, matrix.shape[0], block_rows):
+        yield start, np.asarray(matrix[start:start + block_rows], dtype=float)
+
+@instrumented
+def streaming_svd(matrix, k, method="exact", oversampling=10, power_iterations=2, block_rows=65536,
+                  compute_u=True, u_path=None, seed=0):
+    """
+    Truncated SVD (top k) of a tall matrix that is read in row blocks, e.g. a
+    .npy file opened with mmap_mode="r" (a path is opened that way).
+
+    method="exact" (default): one TSQR pass reduces A to its n x n triangle
+    R, whose SVD gives the exact singular values and right vectors.
+    method="randomized": an approximation for wide-ish matrices. A
+    randomized range finder on the right accumulates Y = A^T A Omega in one
+    pass, each power iteration is one more pass (re-orthonormalized), then
+    TSQR reduces A Q to an l x l triangle (l = k + oversampling; if l >= n
+    this is exact too). With compute_u an extra pass writes U = A V / S,
+    into a .npy memory map at u_path if given.
+
+    Passes over the data: 1 (+1 for U) exact, power_iterations + 2 (+1)
+    randomized. Peak memory is O(block_rows * n + n^2) exact and
+    O(block_rows * n + n * l) randomized, independent of the number of rows
+    (plus U itself unless it goes to u_path).
+    Returns (U, S, Vt); U is None when compute_u is False.
+    """
+    if method not in ("exact", "randomized"):
+        raise ValueError(f"Unknown method {method!r}: use 'exact' or 'randomized'.")
+    if isinstance(matrix, (str, os.PathLike)):
+        matrix = np.load(matrix, mmap_mode="r")
     rows, cols = matrix.shape
+    if not 0 < k <= min(rows, cols):
+        raise ValueError(f"k must be between 1 and {min(rows, cols)}.")
+    sample = cols if method == "exact" else min(cols, k + oversampling)
+
+    if sample == cols:  # Whole column space: no sketch needed, TSQR gives the exact SVD
+        Q = None
+    else:
+        Q = np.random.default_rng(seed).normal(size=(cols, sample))
+        for _ in range(power_iterations + 1):  # Y = A^T A Q, one pass each
+            Y = np.zeros((cols, sample))
+            for _, block in row_blocks(matrix, block_rows):
+                Y += block.T @ (block @ Q)
+            Q, _ = np.linalg.qr(Y)
+
+    R = np.zeros((0, sample))  # TSQR of A Q: only the l x l triangle is kept
+    for _, block in row_blocks(matrix, block_rows):
+        R = np.linalg.qr(np.vstack([R, block if Q is None else block @ Q]), mode="r")
+    Ur, S, Vrt = np.linalg.svd(R)
+    S = S[:k]
+    V = Vrt[:k].T if Q is None else Q @ Vrt[:k].T  # Right singular vectors, cols x k
 
-    if rows == cols:
+    U = None
+    if compute_u:
+        if u_path is not None:
+            U = np.lib.format.open_memmap(u_path, mode="w+", dtype=float, shape=(rows, k))
+        else:
+            U = np.empty((rows, k))
+        scale = np.where(S > 0, 1 / np.where(S > 0, S, 1), 0.0)
+        for start, block in row_blocks(matrix, block_rows):
+            U[start:start + len(block)] = (block @ V) * scale
+        if u_path is not None:
+            U.flush()
+    return U, S, V.T
+
+def as_matvec(matrix, n=None):
+    """
+    Returns (matvec, n, dtype) for a dense or sparse matrix, a scipy
+    LinearOperator, or a plain function v -> A v (then n is required).
+    """
+    if hasattr(matrix, "matvec"):
+        return matrix.matvec, matrix.shape[0], np.dtype(getattr(matrix, "dtype", None) or float)
+    if callable(matrix):
+        if n is None:
+            raise ValueError("n is required when the matrix is given as a matvec function.")
+        return matrix, n, np.dtype(float)
+    if not hasattr(matrix, "toarray"):
+        matrix = np.asarray(matrix)
+    return (lambda v: matrix @ v), matrix.shape[0], matrix.dtype
+
+def shift_invert_operator(matrix, sigma):
+    """
+    Returns v -> (A - sigma I)^-1 v, factoring A - sigma I once
+    (sparse LU for sparse matrices, dense LU otherwise).
+    """
+    if callable(matrix) and not hasattr(matrix, "shape"):
+        raise ValueError("Shift-invert needs the matrix itself, not only a matvec.")
+    n = matrix.shape[0]
+    if hasattr(matrix, "toarray"):
+        if sparse_linalg is None:
+            raise ImportError("Shift-invert on a sparse matrix needs scipy.")
+        shifted = (matrix - sigma * scipy_sparse.identity(n, format="csc")).tocsc()
+        solve = sparse_linalg.splu(shifted).solve
+    else:
+        shifted = np.asarray(matrix) - sigma * np.eye(n)
+        if scipy_linalg is not None:
+            factors = scipy_linalg.lu_factor(shifted)
+            solve = lambda v: scipy_linalg.lu_solve(factors, v)
+        else:
+            inverse = np.linalg.inv(shifted)
+            solve = lambda v: inverse @ v
+    if np.iscomplexobj(shifted.dtype.type(0)):
+        return solve
+    return lambda v: solve(v.real) + 1j * solve(v.imag) if np.iscomplexobj(v) else solve(v)
+
+def _ritz_order(values, which):
+    if which == "LM":
+        return np.argsort(-np.abs(values), kind="stable")
+    if which == "SM":
+        return np.argsort(np.abs(values), kind="stable")
+    if which in ("LR", "LA"):
+        return np.argsort(-values.real, kind="stable")
+    if which in ("SR", "SA"):
+        return np.argsort(values.real, kind="stable")
+    raise ValueError(f"Unknown target {which!r}: use 'LM', 'SM', 'LR'/'LA' or 'SR'/'SA'.")
+
+@instrumented
+def sparse_eigen_decomposition(matrix, k=6, which="LM", sigma=None, hermitian=None, n=None,
+                               tolerance=1e-10, max_restarts=None, ncv=None, max_ncv=None, seed=0):
+    """
+    k eigenpairs of a large (sparse or matrix-free) operator using only
+    matrix-vector products: restarted Lanczos for symmetric/Hermitian input,
+    restarted Arnoldi otherwise (Krylov-Schur thick restart, equivalent to
+    implicit restarting). The basis has ncv vectors (> k; by default ARPACK's
+    min(n, max(2k + 1, 20))). With max_ncv it doubles every KRYLOV_GROW_EVERY
+    restarts without convergence, up to max_ncv vectors. Worst-case memory
+    is (m + 1) n entries for the basis plus (m + 1) m for the projected
+    matrix, m = max_ncv if given, else ncv: O(n k) for the defaults.
+    max_restarts defaults to 10 n, like ARPACK's maxiter.
+    Like any single-vector Krylov method, a repeated eigenvalue may be found
+    only once; shift-invert near it separates the copies much better.
+
+    which picks the largest ("LM") or smallest ("SM") magnitude, or the
+    largest/smallest real part ("LR"/"SR"). With sigma the eigenvalues
+    closest to sigma are found by shift-invert: A - sigma I is factored once
+    and the iteration runs on its inverse.
+
+    Returns an IterationResult whose solution is (eigenvalues, eigenvectors),
+    evaluations is the number of operator applications (matvecs, or solves
+    with shift-invert), iterations the number of restarts and residuals the
+    residual norms of the returned pairs.
+    """
+    matvec, n, dtype = as_matvec(matrix, n)
+    if hermitian is None:
+        hermitian = not callable(matrix) and is_hermitian_operator(matrix)
+    if sigma is not None:
+        matvec = shift_invert_operator(matrix, sigma)
+        hermitian = hermitian and np.isreal(sigma)
+        which = "LM"  # Eigenvalues closest to sigma are the largest of (A - sigma I)^-1
+    if not 0 < k < n:
+        raise ValueError(f"k must be between 1 and {n - 1}.")
+    real = hermitian and not np.iscomplexobj(np.empty(0, dtype)) and np.isreal(sigma or 0)
+    work_dtype = float if real else complex
+    if ncv is not None and not k < ncv:
+        raise ValueError(f"ncv must be larger than k = {k}, got {ncv}.")
+    m = min(n, ncv or max(2 * k + 1, 20))
+    if max_ncv is not None and not max_ncv >= m:
+        raise ValueError(f"max_ncv must be at least ncv = {m}, got {max_ncv}.")
+    max_m = min(n, max_ncv or m)
+    if max_restarts is None:
+        max_restarts = 10 * n
+    keep = max(k, (k + m) // 2)
+
+    V = np.zeros((m + 1, n), dtype=work_dtype)  # Krylov basis, one vector per row
+    H = np.zeros((m + 1, m), dtype=work_dtype)  # Rayleigh quotient; row m couples to the next vector
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(-1, 1, n).astype(work_dtype)
+    V[0] = start / np.linalg.norm(start)
+    p = 0
+    matvecs = 0
+    restart = 0
+    residuals = np.full(k, np.inf)
+
+    while True:
+        for j in range(p, m):  # Expand the basis from p to m vectors
+            w = np.asarray(matvec(V[j]), dtype=work_dtype)
+            matvecs += 1
+            h = V[:j + 1].conj() @ w
+            w -= V[:j + 1].T @ h
+            correction = V[:j + 1].conj() @ w  # Second Gram-Schmidt pass keeps the basis orthogonal
+            w -= V[:j + 1].T @ correction
+            H[:j + 1, j] = h + correction
+            beta = np.linalg.norm(w)
+            H[j + 1, j] = beta
+            if beta <= 1e-14 * np.linalg.norm(H[:j + 2, j]):  # Invariant subspace: continue with a fresh direction
+                H[j + 1, j] = 0.0
+                w = rng.uniform(-1, 1, n).astype(work_dtype)
+                for _ in range(2):
+                    w -= V[:j + 1].T @ (V[:j + 1].conj() @ w)
+                beta = np.linalg.norm(w)
+            V[j + 1] = w / beta
+
+        projected = H[:m, :m]
+        if hermitian:
+            values, vectors = np.linalg.eigh(0.5 * (projected + projected.conj().T))
+        else:
+            values, vectors = np.linalg.eig(projected)
+        order = _ritz_order(values, which)
+        values, vectors = values[order], vectors[:, order]
+        pair_residuals = np.abs(H[m] @ vectors)  # ||A x - theta x|| for x = V s
+        scale = np.maximum(np.abs(values), np.finfo(float).eps ** (2 / 3))
+        residuals = pair_residuals[:k]
+        converged = bool(np.all(residuals <= tolerance * scale[:k])) or m == n
+        if converged or restart >= max_restarts:
+            break
+
+        restart += 1  # Thick restart: keep the best `keep` Ritz vectors as the new basis
+        if hermitian:
+            Q = vectors[:, :keep]
+            T = np.diag(values[:keep]).astype(work_dtype)
+        else:
+            Q, _ = np.linalg.qr(vectors[:, :keep])  # Orthonormal basis of an invariant subspace of H
+            T = Q.conj().T @ projected @ Q
+        coupling = H[m] @ Q
+        basis, residual_vector = Q.T @ V[:m], V[m].copy()
+        if restart % KRYLOV_GROW_EVERY == 0 and m < max_m:  # Slow convergence: enlarge the basis
+            m = min(max_m, 2 * m)
+            V = np.zeros((m + 1, n), dtype=work_dtype)
+            H = np.zeros((m + 1, m), dtype=work_dtype)
+        V[:keep] = basis
+        V[keep] = residual_vector
+        H[:] = 0
+        H[:keep, :keep] = T
+        H[keep, :keep] = coupling
+        p = keep
+        keep = max(k, (k + m) // 2)
+
+    eigenvectors = V[:m].T @ vectors[:, :k]
+    eigenvalues = values[:k]
+    if sigma is not None:
+        eigenvalues = sigma + 1 / eigenvalues
+    if hermitian:
+        eigenvalues = eigenvalues.real
+    message = "" if converged else f"{k} eigenpairs did not converge in {max_restarts} restarts."
+    return IterationResult((eigenvalues, eigenvectors), restart, matvecs, residuals, converged, message)
+
+def sparse_eigen_target(matrix):
+    """
+    The sparse counterpart of compute_matrix_decomposition's top-k: largest
+    eigenvalues for Hermitian input, largest in magnitude otherwise.
+    """
+    return "LA" if is_hermitian_operator(matrix) else "LM"
+
+def is_hermitian_operator(matrix, tolerance=1e-12):
+    """
+    is_hermitian for dense or sparse matrices; operators without entries are
+    assumed non-Hermitian.
+    """
+    if hasattr(matrix, "toarray"):
+        difference = abs(matrix - matrix.conj().T)
+        scale = abs(matrix).max() if matrix.nnz else 0.0
+        return difference.nnz == 0 or difference.max() <= tolerance * scale
+    if hasattr(matrix, "matvec"):
+        return False
+    return is_hermitian(np.asarray(matrix), tolerance)
+
+class InverseOperator:
+    """
+    A^-1 as a lazy operator backed by one cached factorization: Cholesky for
+    symmetric/Hermitian positive definite A, LU with partial pivoting
+    otherwise (sparse LU for sparse A). inverse @ B costs two triangular
+    solves per column instead of forming A^-1 (about 3x fewer flops and more
+    accurate). diag() and trace() solve against block_size unit columns at a
+    time, so memory stays O(n * block_size); materialize() builds the full
+    inverse only when asked. Without scipy every solve refactors A.
+    Like compute_matrix_inverse, A is rejected with LinAlgError when its
+    1-norm condition number (estimated from the factors, kept in
+    self.condition) reaches 1/eps.
+    """
+    def __init__(self, matrix, block_size=256):
+        if not hasattr(matrix, "toarray"):
+            matrix = np.asarray(matrix)
+        rows, cols = matrix.shape
+        if rows != cols:
+            raise ValueError("Matrix is not square, cannot compute inverse.")
+        self.shape = matrix.shape
+        self.dtype = np.result_type(matrix.dtype, float)
+        self.block_size = block_size
+
+        if hasattr(matrix, "toarray"):
+            if sparse_linalg is None:
+                raise ImportError("Factoring a sparse matrix needs scipy.")
+            self.kind = "sparse lu"
+            try:
+                factors = sparse_linalg.splu(matrix.tocsc())
+            except RuntimeError as e:  # "Factor is exactly singular"
+                raise np.linalg.LinAlgError(f"Matrix is singular and cannot be inverted ({e}).")
+            self._solve = factors.solve
+            inverse = sparse_linalg.LinearOperator(self.shape, matvec=factors.solve, dtype=self.dtype,
+                                                   rmatvec=lambda x: factors.solve(x, "H"))
+            self.condition = sparse_linalg.norm(matrix, 1) * sparse_linalg.onenormest(inverse)  # A few solves
+        elif scipy_linalg is None:
+            self.kind = "solve"
+            self._solve = lambda B: np.linalg.solve(matrix, B)
+            self.condition = np.linalg.cond(matrix, 1)
+        else:
+            norm = np.abs(matrix).sum(axis=0).max()
+            factors = None
+            if is_hermitian(matrix):
+                try:
+                    factors = scipy_linalg.cho_factor(matrix)
+                    self.kind = "cholesky"
+                    self._solve = lambda B: scipy_linalg.cho_solve(factors, B)
+                    pocon, = scipy_linalg.get_lapack_funcs(("pocon",), (factors[0],))
+                    rcond = pocon(factors[0], norm, uplo="L" if factors[1] else "U")[0]
+                except np.linalg.LinAlgError:  # Not positive definite
+                    factors = None
+            if factors is None:
+                factors = scipy_linalg.lu_factor(matrix, check_finite=False)
+                self.kind = "lu"
+                self._solve = lambda B: scipy_linalg.lu_solve(factors, B)
+                gecon, = scipy_linalg.get_lapack_funcs(("gecon",), (factors[0],))
+                rcond = gecon(factors[0], norm)[0]  # LAPACK's 1-norm estimate of 1 / cond(A), O(n^2)
+            self.condition = 1 / rcond if rcond > 0 else np.inf
+        if not self.condition * np.finfo(self.dtype).eps < 1:
+            raise np.linalg.LinAlgError(f"Matrix is singular to working precision "
+                                        f"(condition number estimate {self.condition:.3g}).")
+
+    def __matmul__(self, other):
+        """
+        A^-1 @ other for a vector or an (n, m) matrix.
+        """
+        other = np.asarray(other)
+        if other.shape[0] != self.shape[0]:
+            raise ValueError(f"Shapes {self.shape} and {other.shape} are not aligned.")
+        return self._solve(other)
+
+    solve = __matmul__
+
+    def _column_blocks(self):
+        n = self.shape[0]
+        for start in range(0, n, self.block_size):
+            stop = min(start + self.block_size, n)
+            identity = np.zeros((n, stop - start), dtype=self.dtype)
+            identity[np.arange(start, stop), np.arange(stop - start)] = 1
+            yield start, stop, self._solve(identity)
+
+    def diag(self):
+        """
+        Diagonal of A^-1, computed block of columns by block of columns.
+        """
+        diagonal = np.empty(self.shape[0], dtype=self.dtype)
+        for start, stop, columns in self._column_blocks():
+            diagonal[start:stop] = columns[np.arange(start, stop), np.arange(stop - start)]
+        return diagonal
+
+    def trace(self, samples=None, seed=0):
+        """
+        Trace of A^-1: exact from diag(), or with samples=N a Hutchinson
+        estimate from N random +-1 probes (N solves, for very large A).
+        """
+        if samples is None:
+            return self.diag().sum()
+        probes = np.random.default_rng(seed).choice([-1.0, 1.0], size=(self.shape[0], samples))
+        return np.einsum("ij,ij->", probes, self._solve(probes)) / samples
+
+    def materialize(self):
+        """
+        The full inverse matrix (n x n memory).
+        """
+        inverse = np.empty(self.shape, dtype=self.dtype)
+        for start, stop, columns in self._column_blocks():
+            inverse[:, start:stop] = columns
+        return inverse
+
+    def __repr__(self):
+        return f"InverseOperator(shape={self.shape}, kind={self.kind!r})"
+
+@instrumented
+def compute_matrix_inverse(matrix, operator=False):
+    """
+    Computes the inverse of a square matrix if it is invertible; returns None
+    if it is singular (to working precision).
+    With operator=True returns an InverseOperator instead, so A^-1 @ b,
+    diag() and trace() reuse one factorization and A^-1 is never formed.
+    A stack (k, n, n) or a list of square matrices is inverted in batched
+    calls and returns (inverses, singular): singular is a per-matrix mask and
+    those inverses are NaN, so one singular matrix does not stop the batch.
+    """
+    if operator:
         try:
-            inverse = np.linalg.inv(matrix)
-            print("\nInverse Matrix:\n", inverse)
+            return InverseOperator(matrix)
         except np.linalg.LinAlgError:
-            print("\nMatrix is singular and cannot be inverted.")
-    else:
-        print("\nMatrix is not square, cannot compute inverse.")
+            return None
+    if is_matrix_batch(matrix):
+        if isinstance(matrix, np.ndarray):
+            return invert_stack(matrix)
+        results = map_batches(matrix, invert_stack)
+        return [inverse for inverse, _ in results], np.array([singular for _, singular in results])
+    matrix = as_dense_matrix(matrix)
+    rows, cols = matrix.shape
+    if rows != cols:
+        raise ValueError("Matrix is not square, cannot compute inverse.")
+    inverses, singular = invert_stack(matrix[np.newaxis])
+    return None if singular[0] else inverses[0]
+
+def invert_stack(stack):
+    """
+    Inverts a (k, n, n) stack in one LAPACK call. Singular matrices (zero
+    determinant sign from slogdet, or a 1-norm condition number beyond
+    1/eps) are flagged in the returned mask and get NaN inverses.
+    """
+    count, rows, cols = stack.shape
+    if rows != cols:
+        raise ValueError("Matrices are not square, cannot compute inverses.")
+    sign, logdet = np.linalg.slogdet(stack)
+    singular = (sign == 0) | ~np.isfinite(logdet)
+    safe = np.where(singular[:, np.newaxis, np.newaxis], np.eye(rows), stack)  # inv would fail on the whole stack
+    inverses = np.linalg.inv(safe)
+    condition = np.abs(stack).sum(axis=1).max(axis=1) * np.abs(inverses).sum(axis=1).max(axis=1)
+    singular |= ~(condition * np.finfo(inverses.dtype).eps < 1)
+    inverses[singular] = np.nan
+    return inverses, singular
 
 def get_user_matrix():
     """
-    Waits for matrix row by row.
-    Transforms input into a 2D list.
+    Loads the matrix from a file (.csv, .txt, .mtx or .npy) if a path is given,
+    otherwise waits for matrix row by row.
+    Transforms input into a 2D array.
     """
+    path = input("\nEnter a matrix file (.csv/.txt/.mtx/.npy) or press Enter to type it in: ").strip()
+    if path:
+        try:
+            return load_matrix(path)
+        except (OSError, ValueError, ImportError) as e:
+            print("Invalid file!", e)
+            exit()
+
     print("\nProvide your matrix row by row, separating numbers with spaces.")
     print("Example input for a 3x3 matrix:\n 6 1 1\n 4 -2 5\n 2 8 7")
     print("\nTo finish input, press Enter after the last row.")
@@ -70,14 +616,64 @@ def main():
     print("\nChoose an operation:")
     print("1 - Compute Eigenvalues & Eigenvectors or SVD")
     print("2 - Compute Inverse of the Matrix")
-    choice = input("Enter choice (1 or 2): ").strip()
+    print("3 - Solve with the inverse operator (A^-1 b, diag and trace without forming A^-1)")
+    choice = input("Enter choice (1, 2 or 3): ").strip()
 
     user_matrix = get_user_matrix()
 
     if choice == "1":
-        compute_matrix_decomposition(user_matrix)
+        k = input("Number of top pairs to compute (press Enter for all): ").strip()
+        rows, cols = user_matrix.shape[-2:]
+        if user_matrix.ndim == 3:  # Stack of matrices from a .npy file
+            print(f"\nDecomposing a stack of {len(user_matrix)} matrices of shape {rows}x{cols}...")
+            for name, part in zip(("Eigenvalues" if rows == cols else "U", "Eigenvectors" if rows == cols else "S", "V^T"),
+                                  compute_matrix_decomposition(user_matrix, int(k) if k else None)):
+                print(f"\n{name} (shape {part.shape}):\n", part)
+        elif rows == cols:
+            print("\nMatrix is square, computing eigenvalues and eigenvectors...")
+            if hasattr(user_matrix, "toarray") and k and int(k) < rows:  # Sparse file: Lanczos/Arnoldi
+                result = sparse_eigen_decomposition(user_matrix, int(k), which=sparse_eigen_target(user_matrix))
+                eigenvalues, eigenvectors = result.solution
+                print(f"\n{result.evaluations} matrix-vector products, {result.iterations} restarts"
+                      + ("" if result.converged else f" ({result.message})"))
+            else:
+                eigenvalues, eigenvectors = compute_matrix_decomposition(user_matrix, int(k) if k else None)
+            print("\nEigenvalues:", eigenvalues)
+            print("\nEigenvectors:\n", eigenvectors)
+        else:
+            print("\nMatrix is not square, performing Singular Value Decomposition (SVD)...")
+            U, S, Vt = compute_matrix_decomposition(user_matrix, int(k) if k else None)
+            print("\nU (Left Singular Vectors):\n", U)
+            print("\nSingular Values:\n", S)
+            print("\nV^T (Right Singular Vectors Transposed):\n", Vt)
     elif choice == "2":
-        compute_matrix_inverse(user_matrix)
+        try:
+            result = compute_matrix_inverse(user_matrix)
+        except ValueError as e:
+            print("\n" + str(e))
+        else:
+            if user_matrix.ndim == 3:
+                inverses, singular = result
+                print(f"\nInverted {len(inverses)} matrices, {singular.sum()} singular: {np.flatnonzero(singular)}")
+                print("\nInverse Matrices:\n", inverses)
+            elif result is None:
+                print("\nMatrix is singular and cannot be inverted.")
+            else:
+                print("\nInverse Matrix:\n", result)
+    elif choice == "3":
+        try:
+            inverse = compute_matrix_inverse(user_matrix, operator=True)
+        except ValueError as e:
+            print("\n" + str(e))
+            return
+        if inverse is None:
+            print("\nMatrix is singular and cannot be inverted.")
+            return
+        b = np.array(list(map(float, input("Enter the vector b: ").split())))
+        print(f"\nFactorization: {inverse.kind}")
+        print("\nA^-1 b:", inverse @ b)
+        print("\nDiagonal of A^-1:", inverse.diag())
+        print("\nTrace of A^-1:", inverse.trace())
     else:
         print("Invalid. Exiting.")
 
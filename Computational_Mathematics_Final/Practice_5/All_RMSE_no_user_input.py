@@ -1,28 +1,41 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import count_evaluations, instrumented
+
+@instrumented
+def fit_polynomial(x, y, degree):
+    return np.polyfit(x, y, degree)
+
+@instrumented
+def fit_curve(func, x, y, **options):
+    return curve_fit(count_evaluations(func), x, y, **options)
+
 x = np.array([0, 1, 2, 3, 4]) #ollama run llama3.2
 y = np.array([1, 1.8, 1.3, 2, 6.3])
 
 # 1) y = a + bx + cx^2 (Quadratic polynomial)
-coeff_parabola = np.polyfit(x, y, 2)
+coeff_parabola = fit_polynomial(x, y, 2)
 y_parabola_fit = np.polyval(coeff_parabola, x)
 
 # 2) y = a + bx (Linear polynomial)
-coeff_line = np.polyfit(x, y, 1)
+coeff_line = fit_polynomial(x, y, 1)
 y_line_fit = np.polyval(coeff_line, x)
 
 # 3) y = ae^(bx) (Exponential function)
 def exp_func(x, a, b):
     return a * np.exp(b * x)
 
-params_exp, _ = curve_fit(exp_func, x, y, p0=[1, 0.1])
+params_exp, _ = fit_curve(exp_func, x, y, p0=[1, 0.1])
 y_exp_fit = exp_func(x, *params_exp)
 
 
 # 4) y = a + bx + cx^2 + dx^3 (Cubic polynomiaд)
-coeff_cubic = np.polyfit(x, y, 3)
+coeff_cubic = fit_polynomial(x, y, 3)
 y_cubic_fit = np.polyval(coeff_cubic, x)
 
 # 5) y = ax + b/x
@@ -33,7 +46,7 @@ def rational_func(x, a, b):
 try:
     x_non_zero = x[x != 0]
     y_non_zero = y[x != 0]
-    params_rational, _ = curve_fit(rational_func, x_non_zero, y_non_zero)
+    params_rational, _ = fit_curve(rational_func, x_non_zero, y_non_zero)
     y_rational_fit = np.zeros_like(x, dtype=float)
     non_zero_indices = x != 0
     y_rational_fit[non_zero_indices] = rational_func(x[non_zero_indices], *params_rational)
@@ -41,9 +54,11 @@ except Exception as e:
     print("Error in fitting the rational function:", e)
     y_rational_fit = np.full_like(x, np.nan)
 
+@instrumented
 def mse(y_true, y_fit):
     return np.mean((y_true - y_fit)**2)
 
+@instrumented
 def rmse(y_true, y_fit):
     return np.sqrt(mse(y_true, y_fit))
 
@@ -1,94 +1,153 @@
-import math
+import os
+import sys
+import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import instrumented
+
 # Utility functions
+@instrumented
 def calculate_rmsl(y_observed, y_predicted):
-    total = 0
-    count = len(y_observed)
-    for i in range(count):
-        diff = y_observed[i] - y_predicted[i]
-        total += diff * diff
-    return (total / count) ** 0.5
-
-# Model functions
+    diff = np.asarray(y_observed, dtype=float) - np.asarray(y_predicted, dtype=float)
+    return float(np.sqrt(np.mean(diff * diff)))
+
+# Model functions: vectorized least squares fits, coefficients in the order of each model's label
+@instrumented
 def linear_model(x, y):
-    n = len(x)
-    sum_x = sum(x)
-    sum_y = sum(y)
-    sum_x2 = sum(xi * xi for xi in x)
-    sum_xy = sum(x[i] * y[i] for i in range(n))
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_mean, y_mean = x.mean(), y.mean()
+    dx = x - x_mean
 
-    a = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-    b = (sum_y - a * sum_x) / n
-    return a, b
+    a = np.dot(dx, y - y_mean) / np.dot(dx, dx)  # Centered sums, same solution as the normal equations
+    b = y_mean - a * x_mean
+    return float(a), float(b)
 
+@instrumented
 def quadratic_model(x, y):
-    n = len(x)
-    sum_x = sum(x)
-    sum_x2 = sum(xi * xi for xi in x)
-    sum_x3 = sum(xi ** 3 for xi in x)
-    sum_x4 = sum(xi ** 4 for xi in x)
-    sum_y = sum(y)
-    sum_xy = sum(x[i] * y[i] for i in range(n))
-    sum_x2y = sum(x[i] ** 2 * y[i] for i in range(n))
-
-    matrix = [
-        [n, sum_x, sum_x2, sum_y],
-        [sum_x, sum_x2, sum_x3, sum_xy],
-        [sum_x2, sum_x3, sum_x4, sum_x2y]
-    ]
-
-    for i in range(3):
-        for j in range(i + 1, 3):
-            ratio = matrix[j][i] / matrix[i][i]
-            for k in range(4):
-                matrix[j][k] -= ratio * matrix[i][k]
-
-    c = matrix[2][3] / matrix[2][2]
-    b = (matrix[1][3] - matrix[1][2] * c) / matrix[1][1]
-    a = (matrix[0][3] - matrix[0][1] * b - matrix[0][2] * c) / matrix[0][0]
-    return a, b, c
+    x = np.asarray(x, dtype=float)
+    basis = np.column_stack([x * x, x, np.ones_like(x)])
+    a, b, c = np.linalg.lstsq(basis, np.asarray(y, dtype=float), rcond=None)[0]
+    return float(a), float(b), float(c)
 
+@instrumented
 def exponential_model(x, y):
-    log_y = [math.log(yi) if yi > 0 else 0 for yi in y]
-    a, b = linear_model(x, log_y)
-    return math.exp(a), b
+    y = np.asarray(y, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_y = np.where(y > 0, np.log(y), 0.0)
+    b, log_a = linear_model(x, log_y)  # ln y = ln a + bx
+    return float(np.exp(log_a)), b
 
+@instrumented
 def reciprocal_model(x, y):
-    new_x = [1 / xi if xi != 0 else 0 for xi in x]
-    return linear_model(new_x, y)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nonzero = x != 0  # b/x is undefined at x = 0
+    basis = np.column_stack([x[nonzero], 1 / x[nonzero]])
+    a, b = np.linalg.lstsq(basis, y[nonzero], rcond=None)[0]
+    return float(a), float(b)
+
+# Model registry: one class per model type, the single place to add a new model
+MODELS = {}
+
+def register_model(model_class):
+    MODELS[model_class.name] = model_class
+    return model_class
+
+class Model:
+    """
+    A curve-fitting model. fit(x, y) stores the coefficients and predict(x)
+    evaluates the fitted curve, both on whole NumPy arrays.
+    Subclasses set name, equation, label_format, the equation patterns used by
+    detect_model, and implement fit_coefficients and evaluate.
+    """
+    name = None
+    equation = None
+    label_format = None
+    patterns = ()
+
+    def __init__(self, coeffs=None):
+        self.coeffs = coeffs
+
+    def fit(self, x, y):
+        self.coeffs = self.fit_coefficients(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        return self
+
+    def predict(self, x, coeffs=None):
+        coeffs = self.coeffs if coeffs is None else coeffs
+        return self.evaluate(np.asarray(x, dtype=float), *coeffs)
+
+    def label(self):
+        return self.label_format.format(*self.coeffs)
+
+@register_model
+class QuadraticModel(Model):
+    name = "quadratic"
+    equation = "y = ax^2 + bx + c"
+    label_format = "y = {0:.2f}x^2 + {1:.2f}x + {2:.2f}"
+    patterns = ("^2", "x**2")
+    fit_coefficients = staticmethod(quadratic_model)
+
+    @staticmethod
+    def evaluate(x, a, b, c):
+        return (a * x + b) * x + c
+
+@register_model
+class ExponentialModel(Model):
+    name = "exponential"
+    equation = "y = ae^(bx)"
+    label_format = "y = {0:.2f}e^({1:.2f}x)"
+    patterns = ("e^", "exp(")
+    fit_coefficients = staticmethod(exponential_model)
+
+    @staticmethod
+    def evaluate(x, a, b):
+        return a * np.exp(b * x)
+
+@register_model
+class ReciprocalModel(Model):
+    name = "reciprocal"
+    equation = "y = ax + b/x"
+    label_format = "y = {0:.2f}x + {1:.2f}/x"
+    patterns = ("/x",)
+    fit_coefficients = staticmethod(reciprocal_model)
+
+    @staticmethod
+    def evaluate(x, a, b):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return a * x + b / x
+
+@register_model
+class LinearModel(Model):
+    name = "linear"
+    equation = "y = ax + b"
+    label_format = "y = {0:.2f}x + {1:.2f}"
+    patterns = ("x",)  # Registered last: any other model's equation also contains "x"
+    fit_coefficients = staticmethod(linear_model)
+
+    @staticmethod
+    def evaluate(x, a, b):
+        return a * x + b
+
+def fit_model(model_type, x, y):
+    """
+    Fits the registered model by name and returns (model, predicted y at x).
+    """
+    model = MODELS[model_type]().fit(x, y)
+    return model, model.predict(x)
 
 # Plotting function
 def plot_model(x, y, x_label, y_label, title, coeffs, label_format, model, initial_guess=None):
     plt.scatter(x, y, color="blue", label="Observed Data")
 
-    x_fit = sorted(x)
-    y_fit = []
-    for xi in x_fit:
-        if model == "linear":
-            y_fit.append(coeffs[0] * xi + coeffs[1])
-        elif model == "quadratic":
-            y_fit.append(coeffs[0] * xi ** 2 + coeffs[1] * xi + coeffs[2])
-        elif model == "exponential":
-            y_fit.append(coeffs[0] * math.exp(coeffs[1] * xi))
-        elif model == "reciprocal":
-            y_fit.append(coeffs[0] * xi + coeffs[1] / xi)
-
-    plt.plot(x_fit, y_fit, color="red", label="Fitted Curve")
+    model = MODELS[model]() if isinstance(model, str) else model
+    x_fit = np.sort(np.asarray(x, dtype=float))
+    plt.plot(x_fit, model.predict(x_fit, coeffs), color="red", label="Fitted Curve")
     
     # Plot initial guess if provided
     if initial_guess:
-        y_initial_guess = []
-        for xi in x_fit:
-            if model == "linear":
-                y_initial_guess.append(initial_guess[0] * xi + initial_guess[1])
-            elif model == "quadratic":
-                y_initial_guess.append(initial_guess[0] * xi ** 2 + initial_guess[1] * xi + initial_guess[2])
-            elif model == "exponential":
-                y_initial_guess.append(initial_guess[0] * math.exp(initial_guess[1] * xi))
-            elif model == "reciprocal":
-                y_initial_guess.append(initial_guess[0] * xi + initial_guess[1] / xi)
-        plt.plot(x_fit, y_initial_guess, color="green", linestyle="--", label="Initial Guess")
+        plt.plot(x_fit, model.predict(x_fit, initial_guess), color="green", linestyle="--", label="Initial Guess")
 
     plt.xlabel(x_label)
     plt.ylabel(y_label)
@@ -101,16 +160,11 @@ def plot_model(x, y, x_label, y_label, title, coeffs, label_format, model, initi
 def detect_model(equation):
     equation = equation.replace(" ", "")  # Remove spaces
 
-    if "^2" in equation or "x**2" in equation:
-        return "quadratic"
-    elif "e^" in equation or "exp(" in equation:
-        return "exponential"
-    elif "/x" in equation or "1/x" in equation:
-        return "reciprocal"
-    elif "x" in equation:
-        return "linear"
-    else:
-        raise ValueError("Unrecognized equation format. Supported formats are linear, quadratic, exponential, or reciprocal.")
+    for name, model_class in MODELS.items():  # In registration order, most specific first
+        if any(pattern in equation for pattern in model_class.patterns):
+            return name
+    raise ValueError("Unrecognized equation format. Supported formats are "
+                     + ", ".join(MODELS) + ".")
 
 # Example Solutions
 def example_solutions():
@@ -164,32 +218,13 @@ def example_solutions():
         model_type = example["model"]
         initial_guess = example["initial_guess"]
 
-        if model_type == "linear":
-            coeffs = linear_model(x, y)
-            label_format = "y = {0:.2f}x + {1:.2f}"
-        elif model_type == "quadratic":
-            coeffs = quadratic_model(x, y)
-            label_format = "y = {0:.2f}x^2 + {1:.2f}x + {2:.2f}"
-        elif model_type == "exponential":
-            coeffs = exponential_model(x, y)
-            label_format = "y = {0:.2f}e^({1:.2f}x)"
-        elif model_type == "reciprocal":
-            coeffs = reciprocal_model(x, y)
-            label_format = "y = {0:.2f}x + {1:.2f}/x"
-        else:
+        if model_type not in MODELS:
             print("Unrecognized model type.")
             return
 
-        predicted_y = []
-        for xi in x:
-            if model_type == "linear":
-                predicted_y.append(coeffs[0] * xi + coeffs[1])
-            elif model_type == "quadratic":
-                predicted_y.append(coeffs[0] * xi ** 2 + coeffs[1] * xi + coeffs[2])
-            elif model_type == "exponential":
-                predicted_y.append(coeffs[0] * math.exp(coeffs[1] * xi))
-            elif model_type == "reciprocal":
-                predicted_y.append(coeffs[0] * xi + coeffs[1] / xi)
+        model, predicted_y = fit_model(model_type, x, y)
+        coeffs = model.coeffs
+        label_format = model.label_format
 
         rmsl = calculate_rmsl(y, predicted_y)
         print(f"Initial Guess: {initial_guess}")
@@ -211,8 +246,8 @@ def menu():
         if choice == "1":
             example_solutions()
         elif choice == "2":
-            x_values = list(map(float, input("Enter x values (space-separated): ").split()))
-            y_values = list(map(float, input("Enter y values (space-separated): ").split()))
+            x_values = np.array(input("Enter x values (space-separated): ").split(), dtype=float)
+            y_values = np.array(input("Enter y values (space-separated): ").split(), dtype=float)
 
             if len(x_values) != len(y_values):
                 print("Error: x and y values must have the same length.")
@@ -225,32 +260,9 @@ def menu():
                 print(e)
                 continue
 
-            if model_type == "linear":
-                coeffs = linear_model(x_values, y_values)
-                label_format = "y = {0:.2f}x + {1:.2f}"
-            elif model_type == "quadratic":
-                coeffs = quadratic_model(x_values, y_values)
-                label_format = "y = {0:.2f}x^2 + {1:.2f}x + {2:.2f}"
-            elif model_type == "exponential":
-                coeffs = exponential_model(x_values, y_values)
-                label_format = "y = {0:.2f}e^({1:.2f}x)"
-            elif model_type == "reciprocal":
-                coeffs = reciprocal_model(x_values, y_values)
-                label_format = "y = {0:.2f}x + {1:.2f}/x"
-            else:
-                print("Unrecognized model type.")
-                continue
-
-            predicted_y = []
-            for xi in x_values:
-                if model_type == "linear":
-                    predicted_y.append(coeffs[0] * xi + coeffs[1])
-                elif model_type == "quadratic":
-                    predicted_y.append(coeffs[0] * xi ** 2 + coeffs[1] * xi + coeffs[2])
-                elif model_type == "exponential":
-                    predicted_y.append(coeffs[0] * math.exp(coeffs[1] * xi))
-                elif model_type == "reciprocal":
-                    predicted_y.append(coeffs[0] * xi + coeffs[1] / xi)
+            model, predicted_y = fit_model(model_type, x_values, y_values)
+            coeffs = model.coeffs
+            label_format = model.label_format
 
             rmsl = calculate_rmsl(y_values, predicted_y)
             print(f"Coefficients: {coeffs}")
@@ -1,5 +1,10 @@
+import os
+import sys
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import instrumented
+
 # Example Problems String
 EXAMPLES_TEXT = """
 Examples for Numerical Methods:
@@ -63,12 +68,15 @@ def print_examples():
     """ Prints example numerical methods problems. """
     print(EXAMPLES_TEXT)
 
+@instrumented
 def forward_difference(x_values, y_values, step_size):
     return [(y_values[i+1] - y_values[i]) / step_size for i in range(len(y_values) - 1)]
 
+@instrumented
 def central_difference(x_values, y_values, step_size):
     return [(y_values[i+1] - y_values[i-1]) / (2 * step_size) for i in range(1, len(y_values) - 1)]
 
+@instrumented
 def newton_forward_interpolation(x_values, y_values, x_target):
     n = len(x_values)
     diff_table = np.zeros((n, n))
@@ -82,6 +90,7 @@ def newton_forward_interpolation(x_values, y_values, x_target):
         term *= (x_target - x_values[j-1])
         result += term * diff_table[0][j]
     return result
+@instrumented
 def lagrange_interpolation(x_values, y_values, x_target):
     n = len(x_values)
     interpolated_value = 0
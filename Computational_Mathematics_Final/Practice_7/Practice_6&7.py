@@ -1,11 +1,17 @@
+import os
+import sys
 import numpy as np
 from scipy.integrate import quad
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import count_evaluations, instrumented
+
 # Задание 1: Нахождение начального ускорения с использованием данных скорости
 x1 = np.array([0, 5, 10, 15, 20])  # Время (сек)
 y1 = np.array([0, 3, 14, 69, 228])  # Скорость (м/с)
 
+@instrumented
 def newton_forward_diff(x, y):
     """Вычисление производной по формуле Ньютона (прямые разности)."""
     h = x[1] - x[0]  # Шаг (разница между соседними значениями времени)
@@ -39,6 +45,7 @@ plt.show()
 x2 = np.array([3, 5, 11, 17, 27, 34])  # Массив x
 y2 = np.array([-13, 23, 899, 17315, 35606, 61906])  # Массив y
 
+@instrumented
 def finite_diff(x, y, value):
     """Вычисление производной в указанной точке методом конечных разностей."""
     n = len(x)
@@ -81,6 +88,7 @@ plt.show()
 x3 = np.array([1.5, 2.0, 2.5, 3.0, 3.5, 4.0])
 y3 = np.array([3.375, 7.000, 13.625, 24.000, 38.875, 59.000])
 
+@instrumented
 def derivatives_at_point(x, y, point, order):
     """Нахождение производных заданного порядка."""
     n = len(x)
@@ -172,15 +180,19 @@ plt.legend()
 plt.show()
 
 # Интегрирование: Визуализация методов интегрирования
+@instrumented
 def trapezoidal_rule(f, a, b, n):
     """Правило трапеций."""
+    f = count_evaluations(f)
     x = np.linspace(a, b, n + 1)  # Создаем равномерную сетку
     y = f(x)  # Вычисляем значения функции
     h = (b - a) / n  # Шаг сетки
     return (h / 2) * (y[0] + 2 * np.sum(y[1:-1]) + y[-1])  # Формула трапеций
 
+@instrumented
 def simpsons_rule(f, a, b, n):
     """Правило Симпсона 1/3."""
+    f = count_evaluations(f)
     if n % 2:
         n += 1  # Увеличиваем n до ближайшего четного числа
         print(f"Количество сегментов увеличено до {n}, чтобы быть четным.")
@@ -189,8 +201,10 @@ def simpsons_rule(f, a, b, n):
     h = (b - a) / n  # Шаг сетки
     return (h / 3) * (y[0] + 4 * np.sum(y[1:-1:2]) + 2 * np.sum(y[2:-2:2]) + y[-1])  # Формула Симпсона 1/3
 
+@instrumented
 def simpsons_38_rule(f, a, b, n):
     """Правило Симпсона 3/8."""
+    f = count_evaluations(f)
     if n % 3 != 0:
         n = n + (3 - n % 3)  # Увеличиваем n до ближайшего числа, кратного 3
         print(f"Количество сегментов увеличено до {n}, чтобы быть кратным 3.")
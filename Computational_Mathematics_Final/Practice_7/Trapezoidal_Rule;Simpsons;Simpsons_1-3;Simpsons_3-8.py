@@ -1,13 +1,22 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instrumentation import count_evaluations, instrumented
+
+@instrumented
 def trapezoidal_rule(f, a, b, n):
+    f = count_evaluations(f)
     h = (b - a) / n
     x = np.linspace(a, b, n + 1)
     y = f(x)
     return (h / 2) * (y[0] + 2 * sum(y[1:-1]) + y[-1])
 
+@instrumented
 def simpsons_rule(f, a, b, n):
+    f = count_evaluations(f)
     if n % 2:
         n += 1
     x = np.linspace(a, b, n + 1)
@@ -15,7 +24,9 @@ def simpsons_rule(f, a, b, n):
     h = (b - a) / n
     return (h / 3) * (y[0] + 4 * np.sum(y[1:-1:2]) + 2 * np.sum(y[2:-2:2]) + y[-1])
 
+@instrumented
 def simpsons_one_third_rule(f, a, b, n):
+    f = count_evaluations(f)
     if n % 2 == 1:
         n += 1
     h = (b - a) / n
@@ -23,7 +34,9 @@ def simpsons_one_third_rule(f, a, b, n):
     y = f(x)
     return (h / 3) * (y[0] + 4 * sum(y[1:-1:2]) + 2 * sum(y[2:-2:2]) + y[-1])
 
+@instrumented
 def simpsons_three_eighths_rule(f, a, b, n):
+    f = count_evaluations(f)
     if n % 3 != 0:
         n += 3 - (n % 3)
     h = (b - a) / n
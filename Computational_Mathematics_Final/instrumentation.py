@@ -0,0 +1,203 @@
+"""
+Opt-in instrumentation for the numerical methods: evaluation counters,
+phase timers and peak memory (tracemalloc).
+
+Disabled by default. When disabled, @instrumented costs one flag check per
+call and count_evaluations returns the callable unchanged. Enable it with
+enable() or by setting the CM_INSTRUMENT environment variable; with
+CM_INSTRUMENT_JSON=<path> the registry is written to that file at exit.
+"""
+import atexit
+import collections
+import contextlib
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+
+class CallStats:
+    """
+    Work done by one call of an instrumented method.
+    Time not spent in a named phase (parse, compile, post-process, ...)
+    is reported as "iterate".
+    """
+    def __init__(self, name):
+        self.name = name
+        self.evaluations = 0
+        self.points = 0
+        self.phases = collections.defaultdict(float)
+        self.total_time = 0.0
+        self.peak_bytes = 0
+        self.base_bytes = 0  # Traced memory when the call started; peak_bytes is relative to it
+
+    def as_dict(self):
+        phases = dict(self.phases)
+        phases["iterate"] = max(self.total_time - sum(phases.values()), 0.0) + phases.get("iterate", 0.0)
+        return {"name": self.name, "evaluations": self.evaluations, "points": self.points,
+                "total_time": self.total_time, "phases": phases, "peak_bytes": self.peak_bytes}
+
+
+class Registry:
+    """
+    Collects CallStats: per-method totals plus the most recent calls.
+    """
+    def __init__(self, keep_last=1000):
+        self.enabled = False
+        self.track_memory = True
+        self.records = collections.deque(maxlen=keep_last)
+        self.totals = {}
+        self._active = []
+
+    def add(self, stats):
+        record = stats.as_dict()
+        self.records.append(record)
+        total = self.totals.setdefault(stats.name, {"calls": 0, "evaluations": 0, "points": 0,
+                                                    "total_time": 0.0, "phases": {}, "peak_bytes": 0})
+        total["calls"] += 1
+        total["evaluations"] += record["evaluations"]
+        total["points"] += record["points"]
+        total["total_time"] += record["total_time"]
+        total["peak_bytes"] = max(total["peak_bytes"], record["peak_bytes"])
+        for phase_name, seconds in record["phases"].items():
+            total["phases"][phase_name] = total["phases"].get(phase_name, 0.0) + seconds
+
+    @property
+    def last(self):
+        return self.records[-1] if self.records else None
+
+    def summary(self):
+        return {name: dict(total) for name, total in self.totals.items()}
+
+    def to_json(self, path=None):
+        """
+        Returns the totals and recent calls as JSON, also writing it to path if given.
+        """
+        text = json.dumps({"totals": self.summary(), "calls": list(self.records)}, indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    def clear(self):
+        self.records.clear()
+        self.totals.clear()
+
+
+REGISTRY = Registry()
+
+
+def enable(track_memory=True):
+    """
+    Turns instrumentation on. track_memory=False skips tracemalloc, which
+    slows down allocation-heavy code.
+    """
+    REGISTRY.enabled = True
+    REGISTRY.track_memory = track_memory
+
+
+def disable():
+    REGISTRY.enabled = False
+
+
+def current_stats():
+    """
+    Returns the CallStats of the innermost running instrumented call, or None.
+    """
+    return REGISTRY._active[-1] if REGISTRY._active else None
+
+
+def instrumented(func=None, name=None):
+    """
+    Decorator recording a CallStats for every call while instrumentation is
+    enabled. Nested calls are recorded separately, and their evaluations and
+    peak memory also count towards the caller.
+    """
+    if func is None:
+        return functools.partial(instrumented, name=name)
+    stats_name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not REGISTRY.enabled:
+            return func(*args, **kwargs)
+        return _run_instrumented(func, stats_name, args, kwargs)
+    return wrapper
+
+
+def _run_instrumented(func, name, args, kwargs):
+    stats = CallStats(name)
+    parent = current_stats()
+    memory = REGISTRY.track_memory
+    started_tracing = False
+    if memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        elif parent is not None:  # The parent's own peak so far, before reset_peak() forgets it
+            parent.peak_bytes = max(parent.peak_bytes, tracemalloc.get_traced_memory()[1] - parent.base_bytes)
+        stats.base_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    REGISTRY._active.append(stats)
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        stats.total_time = time.perf_counter() - start
+        REGISTRY._active.pop()
+        if memory:
+            stats.peak_bytes = max(stats.peak_bytes, tracemalloc.get_traced_memory()[1] - stats.base_bytes)
+            if started_tracing:
+                tracemalloc.stop()
+        if parent is not None:
+            parent.evaluations += stats.evaluations
+            parent.points += stats.points
+            # The nested peak measured from the parent's base, including what the parent already held
+            parent.peak_bytes = max(parent.peak_bytes, stats.peak_bytes + stats.base_bytes - parent.base_bytes)
+        REGISTRY.add(stats)
+
+
+@contextlib.contextmanager
+def phase(name):
+    """
+    Times a block as the named phase of the running instrumented call.
+    """
+    stats = current_stats()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[name] += time.perf_counter() - start
+
+
+def count_evaluations(func):
+    """
+    Wraps a user callable so every call (and the number of points it was
+    called on) is counted in the running instrumented call. Returns func
+    itself when instrumentation is off, so there is no overhead.
+    """
+    if not REGISTRY.enabled or func is None or getattr(func, "_counted", False):
+        return func
+
+    @functools.wraps(func)
+    def counted(*args, **kwargs):
+        stats = current_stats()
+        if stats is not None:
+            stats.evaluations += 1
+            stats.points += np.size(args[0]) if args else 1
+        return func(*args, **kwargs)
+    counted._counted = True
+    return counted
+
+
+if os.environ.get("CM_INSTRUMENT"):
+    enable(track_memory=os.environ.get("CM_INSTRUMENT") != "nomem")
+if os.environ.get("CM_INSTRUMENT_JSON"):
+    atexit.register(REGISTRY.to_json, os.environ["CM_INSTRUMENT_JSON"])
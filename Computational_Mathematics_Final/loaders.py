@@ -0,0 +1,182 @@
+"""
+File loaders for matrices and right-hand sides, so the solvers are not
+limited to what can be typed into input().
+
+CSV is parsed in chunks straight into one preallocated array, Matrix Market
+files become scipy CSR matrices, and .npy files are memory-mapped read-only,
+so nothing is copied until a method actually needs to write.
+"""
+import functools
+import itertools
+import os
+import tempfile
+import time
+import multiprocessing
+
+import numpy as np
+
+try:
+    import scipy.io
+    import scipy.sparse
+except ImportError: # scipy is only needed for Matrix Market files
+    scipy = None
+
+CSV_CHUNK_BYTES = 4 * 2**20 # Text parsed per chunk; bounds the temporary memory on top of the result
+
+
+def _data_lines(file, comments):
+    for line in file:
+        stripped = line.strip()
+        if stripped and not stripped.startswith(comments):
+            yield stripped
+
+
+def load_csv(path, delimiter=",", dtype=float, chunk_rows=None, comments="#"):
+    """
+    Reads a numeric CSV (or whitespace separated file with delimiter=None).
+    One cheap pass counts the rows, the array is allocated once, and the
+    rows are parsed chunk_rows at a time (by default about CSV_CHUNK_BYTES
+    of text) directly into it.
+    """
+    with open(path) as file:
+        lines = _data_lines(file, comments)
+        first = next(lines, None)
+        if first is None:
+            return np.empty((0, 0), dtype=dtype)
+        columns = len(first.split(delimiter))
+        rows = 1 + sum(1 for _ in lines)
+    if chunk_rows is None:
+        chunk_rows = max(1, CSV_CHUNK_BYTES // (len(first) + 1))
+
+    out = np.empty((rows, columns), dtype=dtype)
+    with open(path) as file:
+        lines = _data_lines(file, comments)
+        start = 0
+        while start < rows:
+            chunk = list(itertools.islice(lines, chunk_rows))
+            stop = start + len(chunk)
+            out[start:stop] = np.loadtxt(chunk, delimiter=delimiter, dtype=dtype, ndmin=2)
+            start = stop
+    return out
+
+
+def load_matrix_market(path):
+    """
+    Reads a Matrix Market file: coordinate files become CSR, array files
+    a dense ndarray.
+    """
+    if scipy is None:
+        raise ImportError("Reading Matrix Market files needs scipy.")
+    matrix = scipy.io.mmread(path)
+    return matrix.tocsr() if scipy.sparse.issparse(matrix) else np.asarray(matrix)
+
+
+def load_npy(path, mmap=True):
+    """
+    Opens a .npy file. With mmap=True the data is memory-mapped read-only and
+    paged in on demand instead of being read into memory up front.
+    """
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def load_matrix(path, **options):
+    """
+    Picks the loader from the extension: .npy, .mtx/.mm, anything else is
+    treated as CSV (.txt/.dat are whitespace separated).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".npy":
+        return load_npy(path, **options)
+    if extension in (".mtx", ".mm"):
+        return load_matrix_market(path)
+    if extension in (".txt", ".dat"):
+        options.setdefault("delimiter", None)
+    return load_csv(path, **options)
+
+
+def load_system(path, rhs_path=None):
+    """
+    Loads a linear system A x = b. Without rhs_path a dense file holds the
+    augmented matrix [A | b] and A, b are returned as views of it (for a
+    sparse file A stays sparse and b is densified); otherwise A and b come
+    from separate files.
+    """
+    A = load_matrix(path)
+    if rhs_path is not None:
+        b = load_matrix(rhs_path)
+        return A, np.ravel(b.toarray() if hasattr(b, "toarray") else b)
+    if A.ndim != 2 or A.shape[1] != A.shape[0] + 1:
+        raise ValueError(f"Expected an augmented n x (n + 1) matrix [A | b], got shape {A.shape}.")
+    b = A[:, -1]
+    return A[:, :-1], np.ravel(b.toarray()) if hasattr(b, "toarray") else b
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process so far (ru_maxrss is KiB on Linux).
+    The resource module is POSIX-only, so elsewhere this returns 0.
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def current_rss_bytes():
+    """
+    Current resident set size (Linux /proc); falls back to the peak elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return peak_rss_bytes()
+
+
+def _measure_load(loader, path, queue):
+    base = current_rss_bytes()
+    start = time.perf_counter()
+    matrix = loader(path)
+    total = float(matrix.sum()) # Touch every element, so memory-mapped data is really read
+    queue.put((time.perf_counter() - start, peak_rss_bytes() - base, total))
+
+
+def benchmark_loaders(n=2000, directory=None, seed=0):
+    """
+    Writes a random n x n matrix as CSV, Matrix Market and .npy, then loads
+    each in a fresh process and reports throughput (MB of float64 data per
+    second) and how far peak RSS rose above the RSS before loading.
+    """
+    A = np.random.default_rng(seed).normal(size=(n, n))
+    megabytes = A.nbytes / 1e6
+    loaders = {"csv": (".csv", load_csv, lambda p: np.savetxt(p, A, delimiter=",")),
+               "npy (mmap)": (".npy", load_npy, lambda p: np.save(p, A)),
+               "npy (read)": (".npy", functools.partial(load_npy, mmap=False), lambda p: np.save(p, A))}
+    if scipy is not None:
+        loaders["matrix market"] = (".mtx", load_matrix_market,
+                                    lambda p: scipy.io.mmwrite(p, scipy.sparse.csr_matrix(A)))
+
+    context = multiprocessing.get_context("spawn") # Fresh interpreter, so ru_maxrss starts from a clean baseline
+    results = {}
+    with tempfile.TemporaryDirectory(dir=directory) as folder:
+        for name, (extension, loader, writer) in loaders.items():
+            path = os.path.join(folder, "matrix" + extension)
+            writer(path)
+            queue = context.Queue()
+            process = context.Process(target=_measure_load, args=(loader, path, queue))
+            process.start()
+            seconds, rss, _ = queue.get()
+            process.join()
+            results[name] = {"seconds": seconds, "mb_per_second": megabytes / seconds,
+                             "peak_rss_mb": rss / 1e6, "file_mb": os.path.getsize(path) / 1e6}
+
+    print(f"Loading a {n}x{n} float64 matrix ({megabytes:.1f} MB in memory):")
+    for name, stats in results.items():
+        print(f"  {name:14s} {stats['seconds']:8.3f} s {stats['mb_per_second']:9.1f} MB/s "
+              f"peak RSS +{stats['peak_rss_mb']:8.1f} MB (file {stats['file_mb']:.1f} MB)")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_loaders()
@@ -0,0 +1,42 @@
+"""
+The practice scripts have file names that are not valid module names
+(spaces, ';', '&'), so the tests load them by path, the way importlib
+users and the batch runner do.
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = {
+    "root_finding": "Practice_1&2/Bisection;Newton-Raphson;False Position;Fixed-Point Iteration.py",
+    "linear_systems": "Practice_3/Gaussian Elimination;Jacobi;Gauss-Seidel.py",
+    "eigen": "Practice_4/Eigenvalues&Eigenvectors_or_SVD;Inverse_Matrix.py",
+}
+
+
+def load_script(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, SCRIPTS[name]))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def root_finding():
+    return load_script("root_finding")
+
+
+@pytest.fixture(scope="session")
+def linear_systems():
+    return load_script("linear_systems")
+
+
+@pytest.fixture(scope="session")
+def eigen():
+    return load_script("eigen")
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+
+def test_memmap_decomposition_is_exact_by_default(eigen, tmp_path):
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(2000, 40)) @ np.diag(np.linspace(1.0, 2.0, 40))
+    path = tmp_path / "a.npy"
+    np.save(path, A)
+    U, S, Vt = eigen.compute_matrix_decomposition(np.load(path, mmap_mode="r"), 5)
+    np.testing.assert_allclose(S, np.linalg.svd(A, compute_uv=False)[:5], rtol=1e-12)
+    np.testing.assert_allclose(U.T @ A, np.diag(S) @ Vt, atol=1e-10)
+
+    U, S, Vt = eigen.compute_matrix_decomposition(np.load(path, mmap_mode="r"), 5, method="randomized")
+    assert S.shape == (5,)
+    with pytest.raises(ValueError):
+        eigen.streaming_svd(path, 5, method="lanczos")
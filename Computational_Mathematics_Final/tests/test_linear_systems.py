@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+
+def test_parallel_jacobi_runs_from_a_module_loaded_by_path(linear_systems):
+    rng = np.random.default_rng(0)
+    A = rng.uniform(-1, 1, (60, 60))
+    A[np.diag_indices(60)] = np.abs(A).sum(axis=1) + 1
+    b = rng.uniform(-1, 1, 60)
+    result = linear_systems.parallel_jacobi_method(A, b, workers=2, iterations=200)
+    assert result.converged
+    np.testing.assert_allclose(result.solution, np.linalg.solve(A, b), atol=1e-8)
+
+
+def test_conjugate_gradient_zero_rhs_converges_immediately(linear_systems):
+    A = np.array([[4.0, 1.0, 0.0], [1.0, 3.0, 1.0], [0.0, 1.0, 2.0]])
+    result = linear_systems.conjugate_gradient_method(A, np.zeros(3))
+    assert result.converged and result.iterations == 0
+    np.testing.assert_array_equal(result.solution, np.zeros(3))
+
+    x = np.array([1.0, -2.0, 0.5])
+    result = linear_systems.conjugate_gradient_method(A, A @ x, preconditioner="jacobi", x0=x)
+    assert result.converged and result.iterations == 0
+
+
+def test_solve_reports_singular_sparse_matrix_as_linalg_error(linear_systems):
+    sparse = pytest.importorskip("scipy.sparse")
+    A = sparse.csr_matrix(np.array([[2.0, -1.0, 0.0], [-4.0, 2.0, 0.0], [0.0, 0.0, 0.0]]))
+    with pytest.raises(np.linalg.LinAlgError):
+        linear_systems.solve(A, np.ones(3))
+
+
+def test_gaussian_elimination_rejects_ill_conditioned_matrix(linear_systems):
+    n = 16
+    hilbert = 1.0 / (np.arange(n)[:, np.newaxis] + np.arange(n) + 1)
+    with pytest.raises(np.linalg.LinAlgError, match="working precision"):
+        linear_systems.gaussian_elimination(hilbert, hilbert @ np.ones(n))
+
+
+def test_gaussian_elimination_accepts_badly_scaled_matrix(linear_systems):
+    np.testing.assert_allclose(linear_systems.gaussian_elimination([[1e20, 0], [0, 1]], [1e20, 1]), [1, 1])
@@ -0,0 +1,11 @@
+import numpy as np
+
+
+def test_find_all_roots_skips_poles_of_tan(root_finding):
+    roots = root_finding.find_all_roots("tan(x)", 0, 10)
+    np.testing.assert_allclose(roots, [0, np.pi, 2 * np.pi, 3 * np.pi], atol=1e-8)
+
+
+def test_find_all_roots_skips_simple_pole(root_finding):
+    assert len(root_finding.find_all_roots("1/(x-1)", 0, 3)) == 0
+    np.testing.assert_allclose(root_finding.find_all_roots("(x-2)/(x-1)", 0, 3), [2], atol=1e-8)
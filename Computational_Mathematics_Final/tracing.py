@@ -0,0 +1,169 @@
+"""
+Iteration trace sinks and the result object returned by the iterative methods.
+
+A method asks make_trace for a sink and calls sink.record(iteration, x, value)
+once per iteration. Nothing is formatted unless a PrintTrace is chosen.
+"""
+import collections
+import numpy as np
+
+
+class NullTrace:
+    """
+    Discards every iterate (the default).
+    """
+    enabled = False
+
+    def record(self, iteration, x, value):
+        pass
+
+
+class RingTrace:
+    """
+    Keeps only the last `size` iterates.
+    """
+    enabled = True
+
+    def __init__(self, size=10):
+        self.entries = collections.deque(maxlen=size)
+
+    def record(self, iteration, x, value):
+        self.entries.append((iteration, np.copy(x), value))
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class HistoryTrace:
+    """
+    Keeps every iterate in preallocated NumPy arrays that double when full.
+    """
+    enabled = True
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.count = 0
+        self._iterations = None
+        self._x = None
+        self._values = None
+
+    def record(self, iteration, x, value):
+        x = np.asarray(x, dtype=float)
+        if self._x is None:
+            self._iterations = np.empty(self.capacity, dtype=int)
+            self._x = np.empty((self.capacity,) + x.shape)
+            self._values = np.empty(self.capacity)
+        elif self.count == len(self._iterations):
+            self._iterations = np.concatenate([self._iterations, np.empty_like(self._iterations)])
+            self._x = np.concatenate([self._x, np.empty_like(self._x)])
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._iterations[self.count] = iteration
+        self._x[self.count] = x
+        self._values[self.count] = value
+        self.count += 1
+
+    @property
+    def iterations(self):
+        return self._iterations[:self.count] if self.count else np.empty(0, dtype=int)
+
+    @property
+    def x(self):
+        return self._x[:self.count] if self.count else np.empty(0)
+
+    @property
+    def values(self):
+        return self._values[:self.count] if self.count else np.empty(0)
+
+    def __len__(self):
+        return self.count
+
+
+class CallbackTrace:
+    """
+    Forwards every iterate to callback(iteration, x, value).
+    """
+    enabled = True
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def record(self, iteration, x, value):
+        self.callback(iteration, x, value)
+
+
+class _ArrayFormat:
+    """
+    Wraps a vector iterate so a scalar format spec such as ".6f" is applied
+    to every entry (np.array2string) instead of failing on the array.
+    """
+    def __init__(self, array):
+        self.array = array
+
+    def __format__(self, spec):
+        if not spec:
+            return np.array2string(self.array)
+        return np.array2string(self.array, formatter={"all": lambda entry: format(entry, spec)})
+
+
+class PrintTrace:
+    """
+    Prints one formatted line per iteration, like the interactive menus do.
+    Works for scalar iterates (root finders) and vectors (linear solvers).
+    """
+    enabled = True
+
+    def __init__(self, line_format="{iteration}-iteration: x = {x:.6f}, f(x) = {value:.6f}"):
+        self.line_format = line_format
+
+    def record(self, iteration, x, value):
+        x = np.asarray(x).item() if np.ndim(x) == 0 else _ArrayFormat(np.asarray(x))
+        print(self.line_format.format(iteration=iteration, x=x, value=value))
+
+
+def make_trace(trace=None):
+    """
+    Turns a trace option into a sink:
+    None or "off" - no trace, an int N - ring buffer of the last N iterates,
+    "history" - full NumPy history, "print" - print every iteration,
+    a callable - callback, or an existing sink which is used as is.
+    """
+    if trace is None or trace == "off":
+        return NullTrace()
+    if trace == "history":
+        return HistoryTrace()
+    if trace == "print":
+        return PrintTrace()
+    if isinstance(trace, int) and not isinstance(trace, bool):
+        return RingTrace(trace)
+    if hasattr(trace, "record"):
+        return trace
+    if callable(trace):
+        return CallbackTrace(trace)
+    raise ValueError(f"Unknown trace option: {trace!r}")
+
+
+class IterationResult:
+    """
+    Outcome of an iterative method: the solution (root or vector), how many
+    iterations and function evaluations it took, the residual history,
+    whether it converged, and the trace sink that was used.
+    """
+    def __init__(self, solution, iterations, evaluations, residuals, converged, message="", trace=None):
+        self.solution = solution
+        self.iterations = iterations
+        self.evaluations = evaluations
+        self.residuals = np.asarray(residuals, dtype=float)
+        self.converged = converged
+        self.message = message
+        self.trace = trace
+
+    @property
+    def root(self):
+        return self.solution
+
+    def __repr__(self):
+        return (f"IterationResult(solution={self.solution!r}, iterations={self.iterations}, "
+                f"evaluations={self.evaluations}, converged={self.converged})")